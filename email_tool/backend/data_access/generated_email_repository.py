@@ -1,13 +1,30 @@
+import os
+from datetime import datetime
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import delete
+from sqlalchemy import delete, update, insert, func
 from ..models.generated_email import GeneratedEmail
 
 class GeneratedEmailRepository:
+    def __init__(self, insert_chunk_size: int | None = None):
+        self.insert_chunk_size = insert_chunk_size or int(os.getenv('GENERATED_EMAIL_INSERT_CHUNK', '500'))
+
     async def get_by_project(self, db: AsyncSession, project_id: int):
         result = await db.execute(select(GeneratedEmail).where(GeneratedEmail.project_id == project_id))
         return result.scalars().all()
 
+    async def get_latest_by_project(self, db: AsyncSession, project_id: int):
+        """Newest email of every (template, locale) pair, leaving older generations out."""
+        latest_ids = (
+            select(func.max(GeneratedEmail.id))
+            .where(GeneratedEmail.project_id == project_id)
+            .group_by(GeneratedEmail.template_id, GeneratedEmail.language)
+        )
+        result = await db.execute(
+            select(GeneratedEmail).where(GeneratedEmail.id.in_(latest_ids)).order_by(GeneratedEmail.id)
+        )
+        return result.scalars().all()
+
     async def get(self, db: AsyncSession, email_id: int):
         result = await db.execute(select(GeneratedEmail).where(GeneratedEmail.id == email_id))
         return result.scalar_one_or_none()
@@ -18,6 +35,117 @@ class GeneratedEmailRepository:
         await db.refresh(email)
         return email
 
+    @staticmethod
+    def _row(email: GeneratedEmail) -> dict:
+        # Every row carries the same keys so chunks go out as one multi-row INSERT
+        row = {
+            column.key: getattr(email, column.key)
+            for column in GeneratedEmail.__table__.columns
+            if column.key != 'id'
+        }
+        row['generated_at'] = row['generated_at'] or datetime.utcnow()
+        return row
+
+    async def create_many(self, db: AsyncSession, emails: list[GeneratedEmail]) -> list[GeneratedEmail | None]:
+        """Persist a whole generation run in one transaction.
+
+        Emails are written in chunks with multi-row ``INSERT ... RETURNING``,
+        each chunk under a savepoint. When a chunk fails its emails are retried
+        one by one, so a bad row only loses itself. The result lines up with
+        ``emails``; emails that could not be stored come back as None.
+        """
+        rows = [self._row(email) for email in emails]
+        statement = insert(GeneratedEmail).returning(GeneratedEmail, sort_by_parameter_order=True)
+        created: list[GeneratedEmail | None] = []
+        for start in range(0, len(rows), self.insert_chunk_size):
+            chunk = rows[start:start + self.insert_chunk_size]
+            try:
+                async with db.begin_nested():
+                    created.extend((await db.scalars(statement, chunk)).all())
+                continue
+            except Exception as e:
+                print(f"Bulk insert of {len(chunk)} generated emails failed, retrying one by one: {e}")
+            for row in chunk:
+                try:
+                    async with db.begin_nested():
+                        created.append(await db.scalar(insert(GeneratedEmail).returning(GeneratedEmail), row))
+                except Exception as e:
+                    print(f"Failed to store generated email for template {row['template_id']} ({row['language']}): {e}")
+                    created.append(None)
+        await db.commit()
+        return created
+
+    async def get_thumbnail_statuses(self, db: AsyncSession, project_id: int):
+        result = await db.execute(
+            select(
+                GeneratedEmail.id,
+                GeneratedEmail.template_id,
+                GeneratedEmail.language,
+                GeneratedEmail.thumbnail_url,
+                GeneratedEmail.thumbnail_status,
+                GeneratedEmail.renders,
+            ).where(GeneratedEmail.project_id == project_id)
+        )
+        return result.all()
+
+    async def get_latest_fingerprints(self, db: AsyncSession, project_id: int) -> dict:
+        """Input fingerprint of the newest email of every (template, locale) pair.
+
+        Only emails whose thumbnails were captured count; pending or failed
+        ones (e.g. a background capture lost to a restart) get regenerated.
+        """
+        result = await db.execute(
+            select(
+                GeneratedEmail.template_id,
+                GeneratedEmail.language,
+                GeneratedEmail.input_fingerprint,
+                GeneratedEmail.thumbnail_status,
+            )
+            .where(GeneratedEmail.project_id == project_id)
+            .order_by(GeneratedEmail.id)
+        )
+        latest = {}
+        for row in result.all():
+            latest[(row.template_id, row.language)] = row
+        return {
+            pair: row.input_fingerprint
+            for pair, row in latest.items()
+            if row.input_fingerprint and row.thumbnail_status == 'done'
+        }
+
+    async def get_latest_thumbnails(self, db: AsyncSession, project_id: int, email_ids: list[int] | None = None):
+        """Newest email with a captured thumbnail for every (template, locale) pair.
+
+        ``email_ids`` restricts the result to those emails, e.g. one generation run.
+        """
+        query = (
+            select(
+                GeneratedEmail.id,
+                GeneratedEmail.template_id,
+                GeneratedEmail.language,
+                GeneratedEmail.thumbnail_url,
+            )
+            .where(
+                GeneratedEmail.project_id == project_id,
+                GeneratedEmail.thumbnail_status == 'done',
+            )
+            .order_by(GeneratedEmail.id)
+        )
+        if email_ids is not None:
+            query = query.where(GeneratedEmail.id.in_(email_ids))
+        result = await db.execute(query)
+        latest = {}
+        for row in result.all():
+            latest[(row.template_id, row.language)] = row
+        return list(latest.values())
+
+    async def set_render_results(self, db: AsyncSession, rows: list[dict]):
+        """Update renders and thumbnail status of many emails, keyed by ``id``."""
+        if not rows:
+            return
+        await db.execute(update(GeneratedEmail), rows)
+        await db.commit()
+
     async def delete(self, db: AsyncSession, email_id: int):
         await db.execute(delete(GeneratedEmail).where(GeneratedEmail.id == email_id))
         await db.commit() 
\ No newline at end of file
@@ -0,0 +1,20 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import insert, desc
+from ..models.link_check_result import LinkCheckResult
+
+class LinkCheckResultRepository:
+    async def get_by_project(self, db: AsyncSession, project_id: int):
+        result = await db.execute(
+            select(LinkCheckResult)
+            .where(LinkCheckResult.project_id == project_id)
+            .order_by(desc(LinkCheckResult.checked_at), LinkCheckResult.id)
+        )
+        return result.scalars().all()
+
+    async def bulk_create(self, db: AsyncSession, rows: list[dict]):
+        """Insert many link results with a single multi-row INSERT statement."""
+        if rows:
+            await db.execute(insert(LinkCheckResult), rows)
+        await db.commit()
+        return len(rows)
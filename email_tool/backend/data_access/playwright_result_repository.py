@@ -0,0 +1,18 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import insert
+from ..models.playwright_result import PlaywrightResult
+
+class PlaywrightResultRepository:
+    async def get_by_email(self, db: AsyncSession, generated_email_id: int):
+        result = await db.execute(
+            select(PlaywrightResult).where(PlaywrightResult.generated_email_id == generated_email_id)
+        )
+        return result.scalars().all()
+
+    async def bulk_create(self, db: AsyncSession, rows: list[dict]):
+        """Insert many results with a single multi-row INSERT statement."""
+        if rows:
+            await db.execute(insert(PlaywrightResult), rows)
+        await db.commit()
+        return len(rows)
@@ -31,6 +31,11 @@ class TestResultRepository:
         await db.refresh(test_result)
         return test_result
 
+    async def create_many(self, db: AsyncSession, test_results: list[TestResult]):
+        db.add_all(test_results)
+        await db.commit()
+        return test_results
+
     async def delete(self, db: AsyncSession, result_id: int):
         await db.execute(delete(TestResult).where(TestResult.id == result_id))
         await db.commit() 
\ No newline at end of file
@@ -8,6 +8,14 @@ class TestScenarioRepository:
         result = await db.execute(select(TestScenario))
         return result.scalars().all()
 
+    async def get_active(self, db: AsyncSession):
+        result = await db.execute(select(TestScenario).where(TestScenario.is_active == True))
+        return result.scalars().all()
+
+    async def get_many(self, db: AsyncSession, scenario_ids: list[int]):
+        result = await db.execute(select(TestScenario).where(TestScenario.id.in_(scenario_ids)))
+        return result.scalars().all()
+
     async def get(self, db: AsyncSession, scenario_id: int):
         result = await db.execute(select(TestScenario).where(TestScenario.id == scenario_id))
         return result.scalar_one_or_none()
@@ -8,6 +8,18 @@ class TestStepRepository:
         result = await db.execute(select(TestStep).where(TestStep.scenario_id == scenario_id).order_by(TestStep.step_order))
         return result.scalars().all()
 
+    async def get_by_scenarios(self, db: AsyncSession, scenario_ids: list[int]):
+        """Load the steps of many scenarios in one query, grouped by scenario id."""
+        result = await db.execute(
+            select(TestStep)
+            .where(TestStep.scenario_id.in_(scenario_ids))
+            .order_by(TestStep.scenario_id, TestStep.step_order)
+        )
+        steps_by_scenario = {}
+        for step in result.scalars().all():
+            steps_by_scenario.setdefault(step.scenario_id, []).append(step)
+        return steps_by_scenario
+
     async def get(self, db: AsyncSession, step_id: int):
         result = await db.execute(select(TestStep).where(TestStep.id == step_id))
         return result.scalar_one_or_none()
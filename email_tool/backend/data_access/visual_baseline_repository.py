@@ -0,0 +1,18 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import delete
+from ..models.visual_baseline import VisualBaseline
+
+class VisualBaselineRepository:
+    async def get_by_templates(self, db: AsyncSession, template_ids: list[int]):
+        result = await db.execute(select(VisualBaseline).where(VisualBaseline.template_id.in_(template_ids)))
+        return result.scalars().all()
+
+    async def save_many(self, db: AsyncSession, baselines: list[VisualBaseline]):
+        db.add_all(baselines)
+        await db.commit()
+        return baselines
+
+    async def delete_by_template(self, db: AsyncSession, template_id: int):
+        await db.execute(delete(VisualBaseline).where(VisualBaseline.template_id == template_id))
+        await db.commit()
@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import insert
+from ..models.visual_diff import VisualDiff
+
+class VisualDiffRepository:
+    async def get_by_email(self, db: AsyncSession, generated_email_id: int):
+        result = await db.execute(select(VisualDiff).where(VisualDiff.generated_email_id == generated_email_id))
+        return result.scalars().all()
+
+    async def bulk_create(self, db: AsyncSession, rows: list[dict]):
+        """Insert many diffs with a single multi-row INSERT statement."""
+        if rows:
+            await db.execute(insert(VisualDiff), rows)
+        await db.commit()
+        return len(rows)
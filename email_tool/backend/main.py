@@ -5,11 +5,17 @@ from pathlib import Path
 from .data_access.database import init_db, get_db
 from .routers import api
 from .services.marketing_group_service import MarketingGroupService
+from .services.job_queue import job_queue
+from .services.render_engine import render_engine
+from email_tool.playwright.browser_pool import browser_pool
+from email_tool.playwright.worker_pool import worker_pool
+from email_tool.playwright import static_checks
 
 # Import all models to ensure they are registered with SQLAlchemy
 from .models import (
     Project, Template, LocalizedCopy, GeneratedEmail, 
-    Placeholder, PlaywrightResult, Tag, TestScenario, TestStep, TestResult, project_tags
+    Placeholder, PlaywrightResult, Tag, TestScenario, TestStep, TestResult, project_tags,
+    VisualBaseline, VisualDiff, LinkCheckResult
 )
 
 app = FastAPI()
@@ -50,4 +56,29 @@ async def startup_event():
         print(f"⚠️  Warning: Could not seed marketing group types: {e}")
         # Continue anyway - the application will work without seeding
 
+    if worker_pool.in_process:
+        # Warm up the shared browser pool used for screenshots and tests
+        try:
+            await browser_pool.start()
+            print(f"✅ Browser pool started with {browser_pool.size} browser(s)")
+        except Exception as e:
+            print(f"⚠️  Warning: Could not start browser pool: {e}")
+            # The pool starts lazily on first use instead
+    else:
+        # Screenshots and tests run in the worker processes, each with its own
+        # browsers; the API's pool starts lazily for the few jobs it still runs
+        await worker_pool.start()
+        print(f"✅ Browser worker pool started with {worker_pool.workers} process(es)")
+
+    # Start background workers for preview rendering and other jobs
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_queue.stop()
+    await worker_pool.stop()
+    await render_engine.stop()
+    await static_checks.stop()
+    await browser_pool.stop()
+
 app.include_router(api.router)
@@ -0,0 +1,46 @@
+"""Add link check results
+
+Revision ID: a3e7b9c1d5f2
+Revises: f2c8d4e6a1b3
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3e7b9c1d5f2'
+down_revision: Union[str, Sequence[str], None] = 'f2c8d4e6a1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('link_check_result',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('host', sa.String(length=255), nullable=True),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('ok', sa.Boolean(), nullable=True),
+    sa.Column('final_url', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('elapsed_ms', sa.Integer(), nullable=True),
+    sa.Column('generated_email_ids', sa.JSON(), nullable=True),
+    sa.Column('checked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_link_check_result_id'), 'link_check_result', ['id'], unique=False)
+    op.create_index(op.f('ix_link_check_result_project_id'), 'link_check_result', ['project_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_link_check_result_project_id'), table_name='link_check_result')
+    op.drop_index(op.f('ix_link_check_result_id'), table_name='link_check_result')
+    op.drop_table('link_check_result')
@@ -0,0 +1,28 @@
+"""Add configurable locale fallbacks to Project
+
+Revision ID: b6d2f8a4c7e1
+Revises: a3e7b9c1d5f2
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2f8a4c7e1'
+down_revision: Union[str, Sequence[str], None] = 'a3e7b9c1d5f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('project', sa.Column('locale_fallbacks', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('project', 'locale_fallbacks')
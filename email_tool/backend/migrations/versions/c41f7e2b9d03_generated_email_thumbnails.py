@@ -0,0 +1,36 @@
+"""Track template and thumbnail status on GeneratedEmail
+
+Revision ID: c41f7e2b9d03
+Revises: a9deaecb7996
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7e2b9d03'
+down_revision: Union[str, Sequence[str], None] = 'a9deaecb7996'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('generated_email', sa.Column('template_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_generated_email_template_id', 'generated_email', 'template', ['template_id'], ['id']
+    )
+    op.add_column('generated_email', sa.Column('thumbnail_url', sa.String(), nullable=True))
+    op.add_column('generated_email', sa.Column('thumbnail_status', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('generated_email', 'thumbnail_status')
+    op.drop_column('generated_email', 'thumbnail_url')
+    op.drop_constraint('fk_generated_email_template_id', 'generated_email', type_='foreignkey')
+    op.drop_column('generated_email', 'template_id')
@@ -0,0 +1,32 @@
+"""Record input fingerprints on GeneratedEmail
+
+Revision ID: c9a4e2f6b8d3
+Revises: b6d2f8a4c7e1
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9a4e2f6b8d3'
+down_revision: Union[str, Sequence[str], None] = 'b6d2f8a4c7e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('generated_email', sa.Column('input_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index(
+        op.f('ix_generated_email_input_fingerprint'), 'generated_email', ['input_fingerprint'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_generated_email_input_fingerprint'), table_name='generated_email')
+    op.drop_column('generated_email', 'input_fingerprint')
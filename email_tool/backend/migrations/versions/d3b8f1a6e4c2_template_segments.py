@@ -0,0 +1,28 @@
+"""Store precompiled placeholder segments on Template
+
+Revision ID: d3b8f1a6e4c2
+Revises: c9a4e2f6b8d3
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3b8f1a6e4c2'
+down_revision: Union[str, Sequence[str], None] = 'c9a4e2f6b8d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('template', sa.Column('segments', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('template', 'segments')
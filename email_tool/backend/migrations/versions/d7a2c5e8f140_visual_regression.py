@@ -0,0 +1,57 @@
+"""Add visual regression baselines and diffs
+
+Revision ID: d7a2c5e8f140
+Revises: c41f7e2b9d03
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2c5e8f140'
+down_revision: Union[str, Sequence[str], None] = 'c41f7e2b9d03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('visual_baseline',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('locale', sa.String(), nullable=False),
+    sa.Column('screenshot_url', sa.String(), nullable=False),
+    sa.Column('phash', sa.String(length=16), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['template.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('template_id', 'locale', name='uix_visual_baseline_template_locale')
+    )
+    op.create_index(op.f('ix_visual_baseline_id'), 'visual_baseline', ['id'], unique=False)
+    op.create_table('visual_diff',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('generated_email_id', sa.Integer(), nullable=False),
+    sa.Column('baseline_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('phash_distance', sa.Integer(), nullable=False),
+    sa.Column('diff_url', sa.String(), nullable=True),
+    sa.Column('passed', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['baseline_id'], ['visual_baseline.id'], ),
+    sa.ForeignKeyConstraint(['generated_email_id'], ['generated_email.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_visual_diff_id'), 'visual_diff', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_visual_diff_id'), table_name='visual_diff')
+    op.drop_table('visual_diff')
+    op.drop_index(op.f('ix_visual_baseline_id'), table_name='visual_baseline')
+    op.drop_table('visual_baseline')
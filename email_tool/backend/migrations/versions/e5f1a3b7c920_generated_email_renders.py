@@ -0,0 +1,28 @@
+"""Record per-profile renders on GeneratedEmail
+
+Revision ID: e5f1a3b7c920
+Revises: d7a2c5e8f140
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f1a3b7c920'
+down_revision: Union[str, Sequence[str], None] = 'd7a2c5e8f140'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('generated_email', sa.Column('renders', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('generated_email', 'renders')
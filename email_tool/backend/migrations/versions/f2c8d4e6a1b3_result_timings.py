@@ -0,0 +1,30 @@
+"""Store per-phase timings on test and Playwright results
+
+Revision ID: f2c8d4e6a1b3
+Revises: e5f1a3b7c920
+Create Date: 2026-10-17 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8d4e6a1b3'
+down_revision: Union[str, Sequence[str], None] = 'e5f1a3b7c920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('test_result', sa.Column('timings', sa.JSON(), nullable=True))
+    op.add_column('playwright_result', sa.Column('timings', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('playwright_result', 'timings')
+    op.drop_column('test_result', 'timings')
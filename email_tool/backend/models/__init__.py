@@ -13,6 +13,9 @@ from .test_step import TestStep
 from .test_result import TestResult
 from .project_tag import project_tags
 from .marketing_group_type import MarketingGroupType
+from .visual_baseline import VisualBaseline
+from .visual_diff import VisualDiff
+from .link_check_result import LinkCheckResult
 
 __all__ = [
     'Base',
@@ -30,4 +33,7 @@ __all__ = [
     'TestResult',
     'project_tags',
     'MarketingGroupType',
+    'VisualBaseline',
+    'VisualDiff',
+    'LinkCheckResult',
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -8,9 +8,14 @@ class GeneratedEmail(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey('project.id'))
+    template_id = Column(Integer, ForeignKey('template.id'), nullable=True)
     language = Column(String, nullable=False)
     html_content = Column(Text, nullable=False)
     generated_at = Column(DateTime, default=datetime.utcnow)
+    thumbnail_url = Column(String, nullable=True)
+    thumbnail_status = Column(String(20), nullable=True)  # 'pending', 'done', 'failed'
+    renders = Column(JSON, nullable=True)  # {profile: {'screenshot_url': ..., 'status': ...}}
+    input_fingerprint = Column(String(64), nullable=True, index=True)  # Hash of template, resolved copy and profiles
 
     project = relationship('Project', back_populates='generated_emails')
     test_result = relationship('PlaywrightResult', back_populates='generated_email', uselist=False)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
+from datetime import datetime
+from .base import Base
+
+class LinkCheckResult(Base):
+    __tablename__ = 'link_check_result'
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey('project.id'), nullable=False, index=True)
+    url = Column(Text, nullable=False)
+    host = Column(String(255), nullable=True)
+    status_code = Column(Integer, nullable=True)  # None when the request failed
+    ok = Column(Boolean, default=False)
+    final_url = Column(Text, nullable=True)  # URL after redirects
+    error = Column(Text, nullable=True)
+    elapsed_ms = Column(Integer, nullable=True)
+    generated_email_ids = Column(JSON, nullable=True)  # Emails containing the link
+    checked_at = Column(DateTime, default=datetime.utcnow)
@@ -10,6 +10,7 @@ class PlaywrightResult(Base):
     generated_email_id = Column(Integer, ForeignKey('generated_email.id'))
     passed = Column(Boolean, default=False)
     issues = Column(JSON)
+    timings = Column(JSON, nullable=True)  # Per-phase and per-step timings in milliseconds
     tested_at = Column(DateTime, default=datetime.utcnow)
 
     generated_email = relationship('GeneratedEmail', back_populates='test_result')
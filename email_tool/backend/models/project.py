@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -12,6 +12,7 @@ class Project(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     status = Column(String, nullable=False, default='New')
     customer_id = Column(Integer, ForeignKey('customer.id'), nullable=True)
+    locale_fallbacks = Column(JSON, nullable=True)  # {locale: [fallback, ...]}, overrides the default chain
 
     customer = relationship('Customer', backref='projects')
     marketing_groups = relationship('MarketingGroup', back_populates='project', cascade='all, delete')
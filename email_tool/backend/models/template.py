@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -11,6 +11,7 @@ class Template(Base):
     marketing_group_id = Column(Integer, ForeignKey('marketing_group.id'), nullable=False)
     filename = Column(String, nullable=False)
     content = Column(Text, nullable=False)
+    segments = Column(JSON, nullable=True)  # [literal, key, literal, ...] for plain {{key}} templates, else null
     created_at = Column(DateTime, default=datetime.utcnow)
 
     project = relationship('Project', back_populates='templates')
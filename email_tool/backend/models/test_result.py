@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
@@ -14,6 +14,7 @@ class TestResult(Base):
     error_message = Column(Text, nullable=True)  # Error details if failed
     screenshot_path = Column(String(500), nullable=True)  # Path to screenshot if failed
     logs = Column(Text, nullable=True)  # Test execution logs
+    timings = Column(JSON, nullable=True)  # Per-phase and per-step timings in milliseconds
 
     # Relationships
     scenario = relationship('TestScenario', back_populates='test_results') 
\ No newline at end of file
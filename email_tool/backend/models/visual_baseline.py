@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from .base import Base
+
+class VisualBaseline(Base):
+    __tablename__ = 'visual_baseline'
+
+    id = Column(Integer, primary_key=True, index=True)
+    template_id = Column(Integer, ForeignKey('template.id'), nullable=False)
+    locale = Column(String, nullable=False)
+    screenshot_url = Column(String, nullable=False)
+    phash = Column(String(16), nullable=False)  # 64-bit difference hash as hex
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    diffs = relationship('VisualDiff', back_populates='baseline', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        UniqueConstraint('template_id', 'locale', name='uix_visual_baseline_template_locale'),
+    )
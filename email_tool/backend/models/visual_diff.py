@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from .base import Base
+
+class VisualDiff(Base):
+    __tablename__ = 'visual_diff'
+
+    id = Column(Integer, primary_key=True, index=True)
+    generated_email_id = Column(Integer, ForeignKey('generated_email.id'), nullable=False)
+    baseline_id = Column(Integer, ForeignKey('visual_baseline.id'), nullable=False)
+    score = Column(Float, nullable=False)  # Fraction of pixels that changed (0.0 - 1.0)
+    phash_distance = Column(Integer, nullable=False)  # Hamming distance of perceptual hashes
+    diff_url = Column(String, nullable=True)  # Diff mask image, None when nothing changed
+    passed = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    baseline = relationship('VisualBaseline', back_populates='diffs')
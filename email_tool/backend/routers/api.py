@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..data_access.database import get_db
+from ..data_access.database import get_db, AsyncSessionLocal
 from ..services.project_service import ProjectService
 from ..services.marketing_group_service import MarketingGroupService
 from ..services.template_service import TemplateService
@@ -10,14 +10,21 @@ from ..services.test_service import TestService
 from ..services.tag_service import TagService
 from ..services.test_builder_service import TestBuilderService
 from ..services.template_render_service import TemplateRenderService
-from pydantic import BaseModel
+from ..services.job_queue import job_queue
+from ..services.visual_regression_service import VisualRegressionService
+from ..services.link_check_service import LinkCheckService
+from ..services.locale_resolver import fallback_chain
+from email_tool.playwright.page_settle import SETTLE_MODES
+from email_tool.playwright.render_profiles import resolve_profiles
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 import os
 from sqlalchemy import select
 from ..models.generated_email import GeneratedEmail
 from ..models.customer import Customer
 from ..models.copy_comment import CopyComment
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
 
 router = APIRouter()
 
@@ -30,6 +37,8 @@ test_service = TestService()
 tag_service = TagService()
 test_builder_service = TestBuilderService()
 template_render_service = TemplateRenderService()
+visual_regression_service = VisualRegressionService()
+link_check_service = LinkCheckService()
 
 class TagCreate(BaseModel):
     name: str
@@ -212,6 +221,47 @@ async def update_project_status(project_id: int, status_update: StatusUpdate, db
     return {'id': project.id, 'name': project.name, 'status': project.status}
 
 
+@router.get('/project/{project_id}/locale-fallbacks')
+async def get_locale_fallbacks(project_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the configured fallbacks and the resulting chain for every locale of a project"""
+    project = await project_service.get_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    copies = await copy_service.get_copies(db, project_id)
+    locales = list(dict.fromkeys(copy.locale for copy in copies))
+    return {
+        'locale_fallbacks': project.locale_fallbacks or {},
+        'chains': {locale: fallback_chain(locale, project.locale_fallbacks) for locale in locales},
+    }
+
+
+@router.put('/project/{project_id}/locale-fallbacks')
+async def update_locale_fallbacks(
+    project_id: int,
+    fallbacks: Dict[str, List[str]],
+    db: AsyncSession = Depends(get_db),
+):
+    """Replace a project's locale fallbacks, e.g. {"fr-CA": ["fr", "en"]}"""
+    try:
+        project = await project_service.update_locale_fallbacks(db, project_id, fallbacks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    return {'id': project.id, 'locale_fallbacks': project.locale_fallbacks or {}}
+
+
+async def render_template_preview(template_id: int) -> dict:
+    """Background job: render a template preview with its own database session"""
+    async with AsyncSessionLocal() as session:
+        preview = await template_render_service.get_template_preview(session, template_id)
+    return {
+        'template_id': template_id,
+        'preview_image': preview['preview_image'],
+        'settle_ms': preview['settle_ms'],
+    }
+
+
 @router.post('/template')
 async def upload_template(
     project_id: int = Form(...),
@@ -229,23 +279,30 @@ async def upload_template(
             raise HTTPException(status_code=404, detail='Project not found')
         
         # Generate preview image in background
-        try:
-            template_id = getattr(template, 'id')
-            await template_render_service.get_template_preview(db, template_id)
-        except Exception as preview_error:
-            # Don't fail the upload if preview generation fails
-            print(f"Failed to generate preview for template {getattr(template, 'id')}: {preview_error}")
+        preview_job_id = await job_queue.enqueue(
+            'template_preview', render_template_preview, getattr(template, 'id')
+        )
         
         return {
             'template_id': template.id, 
             'placeholders': keys,
             'created_tags': created_tags,
+            'preview_job_id': preview_job_id,
             'message': f'Template uploaded successfully. {len(created_tags)} new tags were created.'
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.get('/jobs/{job_id}')
+async def get_job_status(job_id: str):
+    """Get status and timings of a background job"""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Job not found')
+    return job
+
+
 @router.get('/placeholders/{template_id}')
 async def get_placeholders(template_id: int, db: AsyncSession = Depends(get_db)):
     keys = await template_service.get_placeholders(db, template_id)
@@ -389,22 +446,87 @@ async def delete_locale_copies(
     return {'message': f'Deleted {count} copy entries for locale {locale}'}
 
 
+async def compare_generated_emails(project_id: int, threshold: float, email_ids: list[int]) -> dict:
+    """Background job: diff the screenshots of one generation run against their visual baselines"""
+    # This run's screenshots may still be captured in the background
+    await email_service.wait_for_thumbnails(email_ids)
+    async with AsyncSessionLocal() as session:
+        comparison = await visual_regression_service.compare_project(session, project_id, threshold, email_ids)
+    return {key: value for key, value in comparison.items() if key != 'results'}
+
+
 @router.post('/generate/{project_id}')
-async def generate_emails(project_id: int, db: AsyncSession = Depends(get_db)):
-    result = await email_service.generate_emails(db, project_id)
+async def generate_emails(
+    project_id: int,
+    wait_for_thumbnails: bool = True,
+    profiles: Optional[str] = None,
+    force: bool = False,
+    visual_compare: bool = True,
+    threshold: float = 0.001,
+    db: AsyncSession = Depends(get_db),
+):
+    """Generate emails whose inputs changed (all of them with force), capturing the given render profiles
+
+    New screenshots are then compared with their visual baselines in a background job.
+    """
+    try:
+        profile_names = resolve_profiles(profiles.split(',') if profiles else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        result = await email_service.generate_emails(db, project_id, wait_for_thumbnails, profile_names, force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate emails: {str(e)}")
     if result is None:
         raise HTTPException(status_code=404, detail='Project not found')
+    if visual_compare and result['generated']:
+        result['visual_compare_job_id'] = await job_queue.enqueue(
+            'visual_compare', compare_generated_emails, project_id, threshold,
+            [email['id'] for email in result['emails']],
+        )
     return result
 
 
+@router.post('/generate/{project_id}/stream')
+async def stream_generate_emails(
+    project_id: int,
+    profiles: Optional[str] = None,
+    force: bool = False,
+    include_html: bool = False,
+    format: str = 'ndjson',
+):
+    """Generate emails and stream one event per finished email as NDJSON or Server-Sent Events"""
+    if format not in ('ndjson', 'sse'):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+    try:
+        profile_names = resolve_profiles(profiles.split(',') if profiles else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def events():
+        # The request's session is gone once streaming starts, so use our own
+        async with AsyncSessionLocal() as session:
+            async for event in email_service.stream_emails(session, project_id, profile_names, force, include_html):
+                data = json.dumps(event)
+                if format == 'sse':
+                    yield f"event: {event['event']}\ndata: {data}\n\n"
+                else:
+                    yield data + '\n'
+
+    media_type = 'text/event-stream' if format == 'sse' else 'application/x-ndjson'
+    return StreamingResponse(events(), media_type=media_type, headers={'Cache-Control': 'no-cache'})
+
+
 @router.post('/test/{project_id}')
 async def run_tests(
     project_id: int, 
     test_config: Optional[TestConfig] = None,
+    concurrency: Optional[int] = Query(None, ge=1),
     db: AsyncSession = Depends(get_db)
 ):
-    count = await test_service.run_tests(db, project_id, test_config.dict() if test_config else None)
-    return {'tested': count}
+    return await test_service.run_tests(
+        db, project_id, test_config.dict() if test_config else None, concurrency
+    )
 
 
 @router.get('/tags')
@@ -489,10 +611,12 @@ async def delete_template(template_id: int, db: AsyncSession = Depends(get_db)):
     return {'message': 'Template deleted successfully'}
 
 @router.get('/template/{template_id}/preview')
-async def get_template_preview(template_id: int, db: AsyncSession = Depends(get_db)):
+async def get_template_preview(template_id: int, settle: Optional[str] = None, db: AsyncSession = Depends(get_db)):
     """Get template preview with rendered image"""
+    if settle and settle not in SETTLE_MODES:
+        raise HTTPException(status_code=400, detail=f"settle must be one of {', '.join(SETTLE_MODES)}")
     try:
-        preview = await template_render_service.get_template_preview(db, template_id)
+        preview = await template_render_service.get_template_preview(db, template_id, settle)
         return preview
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -500,13 +624,15 @@ async def get_template_preview(template_id: int, db: AsyncSession = Depends(get_
         raise HTTPException(status_code=500, detail=f"Failed to generate preview: {str(e)}")
 
 @router.post('/template/{template_id}/preview/regenerate')
-async def regenerate_template_preview(template_id: int, db: AsyncSession = Depends(get_db)):
+async def regenerate_template_preview(template_id: int, settle: Optional[str] = None, db: AsyncSession = Depends(get_db)):
     """Regenerate template preview image"""
+    if settle and settle not in SETTLE_MODES:
+        raise HTTPException(status_code=400, detail=f"settle must be one of {', '.join(SETTLE_MODES)}")
     try:
         # Delete existing previews first
         await template_render_service.delete_template_previews(template_id)
-        # Generate new preview
-        preview = await template_render_service.get_template_preview(db, template_id)
+        # Render again even if the same HTML is cached; its assets may have changed
+        preview = await template_render_service.get_template_preview(db, template_id, settle, force=True)
         return preview
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -523,19 +649,55 @@ async def get_generated_emails(project_id: int, db: AsyncSession = Depends(get_d
     # Compose thumbnail URL
     results = []
     for email in emails:
-        guid = str(email.id)  # fallback to id for filename if needed
-        screenshot_filename = f"{guid}.png"
-        thumbnail_url = f"/static/screenshots/{screenshot_filename}"
+        screenshot_url = email.thumbnail_url
+        if not screenshot_url:
+            guid = str(email.id)  # fallback to id for filename if needed
+            screenshot_filename = f"{guid}.png"
+            screenshot_url = f"/static/screenshots/{screenshot_filename}"
         results.append({
             'id': email.id,
             'project_id': email.project_id,
+            'template_id': email.template_id,
             'language': email.language,
             'html_content': email.html_content,
             'generated_at': email.generated_at.isoformat() if getattr(email, 'generated_at', None) else None,
-            'thumbnail_url': thumbnail_url
+            **email_service.thumbnail_urls(screenshot_url, email.thumbnail_status, email.renders),
+            'screenshot_url': screenshot_url,
+            'thumbnail_status': email.thumbnail_status,
+            'renders': email_service.render_urls(email.renders)
         })
     return results
 
+@router.get('/emails/{project_id}/thumbnails')
+async def get_thumbnail_statuses(project_id: int, db: AsyncSession = Depends(get_db)):
+    """Get thumbnail status for every generated email of a project"""
+    return await email_service.get_thumbnail_statuses(db, project_id)
+
+@router.post('/visual/{project_id}/baseline')
+async def set_visual_baselines(project_id: int, db: AsyncSession = Depends(get_db)):
+    """Approve the latest screenshots of a project as its visual baselines"""
+    count = await visual_regression_service.set_baselines(db, project_id)
+    return {'message': f'Saved {count} baselines', 'baselines': count}
+
+@router.post('/visual/{project_id}/compare')
+async def compare_visual_baselines(
+    project_id: int,
+    threshold: float = 0.001,
+    db: AsyncSession = Depends(get_db),
+):
+    """Diff the latest screenshots of a project against their baselines"""
+    return await visual_regression_service.compare_project(db, project_id, threshold)
+
+@router.post('/links/{project_id}/check')
+async def check_links(project_id: int, db: AsyncSession = Depends(get_db)):
+    """Check every unique link in the project's generated emails"""
+    return await link_check_service.check_project(db, project_id)
+
+@router.get('/links/{project_id}')
+async def get_link_results(project_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the results of the latest link check of a project"""
+    return await link_check_service.get_latest_results(db, project_id)
+
 from ..data_access.copy_comment_repository import CopyCommentRepository
 
 copy_comment_repository = CopyCommentRepository()
@@ -698,6 +860,16 @@ async def delete_test_scenario(scenario_id: int, db: AsyncSession = Depends(get_
         raise HTTPException(status_code=404, detail='Test scenario not found')
     return {'message': 'Test scenario deleted successfully'}
 
+class ScenarioBatchRun(BaseModel):
+    scenario_ids: Optional[List[int]] = None
+    concurrency: Optional[int] = Field(None, ge=1)
+
+@router.post('/test-builder/scenarios/run')
+async def run_test_scenarios(batch: Optional[ScenarioBatchRun] = None, db: AsyncSession = Depends(get_db)):
+    """Run selected (or all active) test scenarios concurrently and return a summary"""
+    batch = batch or ScenarioBatchRun()
+    return await test_builder_service.run_test_scenarios(db, batch.scenario_ids, batch.concurrency)
+
 @router.post('/test-builder/scenario/{scenario_id}/run')
 async def run_test_scenario(scenario_id: int, db: AsyncSession = Depends(get_db)):
     """Run a test scenario and return results"""
@@ -1,127 +1,497 @@
+import asyncio
+import hashlib
+import json
 import os
-import uuid
-from email_tool.playwright.test_runner import screenshot
+import time
+from pathlib import Path
+from typing import AsyncIterator
+from email_tool.playwright.test_runner import render_many
+from email_tool.playwright.worker_pool import worker_pool
+from email_tool.playwright.render_profiles import RENDER_PROFILES, profile_cache_options, resolve_profiles
+from email_tool.playwright.screenshot_cache import ScreenshotCache
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from jinja2 import Template as JinjaTemplate
 from ..models import Project, GeneratedEmail, LocalizedCopy, Template, Placeholder
+from ..data_access.database import AsyncSessionLocal
 from ..data_access.project_repository import ProjectRepository
 from ..data_access.template_repository import TemplateRepository
 from ..data_access.localized_copy_repository import LocalizedCopyRepository
 from ..data_access.placeholder_repository import PlaceholderRepository
 from ..data_access.generated_email_repository import GeneratedEmailRepository
+from .thumbnail_service import ThumbnailService
+from .template_cache import template_cache
+from .render_engine import RenderTask, render_engine
+from .locale_resolver import LocaleResolver
 from datetime import datetime
 
 
 class EmailService:
-    """Generate localized HTML emails with screenshot thumbnails."""
+    """Generate localized HTML emails with screenshot thumbnails.
 
-    def __init__(self):
+    Generation runs in three stages: every (template, locale) pair is
+    rendered first, the results are persisted in one transaction, and the
+    thumbnails are then captured concurrently on reused browser pages.
+    Each email is loaded once and captured in every requested render
+    profile; the first profile provides the list thumbnail. Screenshots
+    are content-addressed, so unchanged renders never reach the browser
+    again. ``stream_emails`` runs the same stages chunk by chunk and
+    yields each email as soon as it is finished.
+    """
+
+    def __init__(self, screenshot_concurrency: int | None = None):
         self.project_repository = ProjectRepository()
         self.template_repository = TemplateRepository()
         self.localized_copy_repository = LocalizedCopyRepository()
         self.placeholder_repository = PlaceholderRepository()
         self.generated_email_repository = GeneratedEmailRepository()
+        self.screenshots_dir = Path(__file__).resolve().parent / 'static' / 'screenshots'
+        self.screenshot_cache = ScreenshotCache(self.screenshots_dir)
+        self.thumbnail_service = ThumbnailService(self.screenshots_dir)
+        self.screenshot_concurrency = screenshot_concurrency or int(
+            os.getenv('SCREENSHOT_CONCURRENCY', '4')
+        )
+        self.stream_chunk_size = int(os.getenv('GENERATE_STREAM_CHUNK', '16'))
+        # Keep references to background thumbnail tasks so they are not collected
+        # Each task maps to the ids of the emails it captures
+        self._thumbnail_tasks: dict[asyncio.Task, set[int]] = {}
+
+    async def generate_emails(
+        self,
+        db: AsyncSession,
+        project_id: int,
+        wait_for_thumbnails: bool = True,
+        profiles: list[str] | None = None,
+        force: bool = False,
+    ) -> dict | None:
+        """Render the project's (template, locale) pairs whose inputs changed since the last run.
 
-    async def generate_emails(self, db: AsyncSession, project_id: int) -> dict | None:
+        Every email records a fingerprint of its template, resolved copy and
+        render profiles; pairs whose fingerprint matches their newest email
+        are skipped unless ``force`` is set.
+        """
+        profiles = resolve_profiles(profiles)
         try:
             project = await self.project_repository.get(db, project_id)
             if project is None:
                 return None
-            
+
             # Get templates for this project
             templates = await self.template_repository.get_by_project(db, project_id)
-            
+
             if len(templates) == 0:
-                return {'generated': 0, 'emails': []}
-            
+                return {'generated': 0, 'rendered': 0, 'skipped': 0, 'emails': []}
+
             # Get all copy entries for this project
             copies = await self.localized_copy_repository.get_by_project(db, project_id)
-            
+
             if len(copies) == 0:
-                return {'generated': 0, 'emails': []}
-            
-            emails: list[dict] = []
-            generated_count = 0
-            
-            for template in templates:
-                # Get placeholders for this template
-                placeholder_keys = await self.placeholder_repository.get_keys_by_template(db, getattr(template, 'id'))
-                placeholders = {str(key) for key in placeholder_keys}
-                
-                # Get unique locales from copy entries
-                locales = {c.locale for c in copies}
-                
-                for locale in locales:
-                    # Get copy entries for this locale
-                    locale_copy = {str(c.key): str(c.value) for c in copies if c.locale == locale}
-                    
-                    # Fallback: if missing, try base language (e.g., en-GB -> en)
-                    if '-' in locale:
-                        base_lang = locale.split('-')[0]
-                        base_copy = {str(c.key): str(c.value) for c in copies if c.locale == base_lang}
-                        for k, v in base_copy.items():
-                            if k not in locale_copy:
-                                locale_copy[k] = v
-                    # Fallback: if still missing, try 'en' as global default
-                    if locale != 'en':
-                        en_copy = {str(c.key): str(c.value) for c in copies if c.locale == 'en'}
-                        for k, v in en_copy.items():
-                            if k not in locale_copy:
-                                locale_copy[k] = v
-                    
-                    # Check if we have all required placeholders for this locale
-                    if not placeholders.issubset(set(locale_copy.keys())):
-                        continue
-                    
-                    try:
-                        # Render the template with the copy
-                        jinja = JinjaTemplate(str(template.content))
-                        html = jinja.render(**locale_copy)
-                        
-                        # Create and save the generated email
-                        email = GeneratedEmail(
-                            project_id=project_id,
-                            language=locale,  # keep field name for now
-                            html_content=html,
-                        )
-                        email = await self.generated_email_repository.create(db, email)
-
-                        # --- Screenshot logic ---
-                        guid = str(uuid.uuid4())
-                        screenshot_filename = f"{guid}.png"
-                        screenshot_path = os.path.join(
-
-                            Path(__file__).resolve().parent / 'static' / 'screenshots',
-
-                            screenshot_filename,
-                        )
-                        screenshot_url = f"/static/screenshots/{screenshot_filename}"
-                        # Generate screenshot using Playwright
-                        await screenshot(html, screenshot_path)
-                        # --- End screenshot logic ---
-                        
-                        # Add to our result list
-                        emails.append({
-                            'id': email.id,
-                            'locale': locale,
-                            'html_content': html,
-                            'generated_at': datetime.utcnow().isoformat(),
-                            'thumbnail_url': screenshot_url
-                        })
-                        generated_count += 1
-                        
-                    except Exception as e:
-                        print(
-                            f"Error rendering template or generating screenshot for locale {locale}: {e}"
-                        )
-                        continue
-            
-            await db.commit()
-            return {'generated': generated_count, 'emails': emails}
-            
+                return {'generated': 0, 'rendered': 0, 'skipped': 0, 'emails': []}
+
+            # --- Stage 1: render every (template, locale) pair whose inputs changed ---
+            previous = {} if force else await self.generated_email_repository.get_latest_fingerprints(db, project_id)
+            rendered, skipped = await self._render_all(
+                db, templates, copies, project.locale_fallbacks, profiles, previous
+            )
+
+            # --- Stage 2: persist all generated emails at once ---
+            emails = [self._new_email(project_id, item, profiles) for item in rendered]
+            created = await self.generated_email_repository.create_many(db, emails)
+            # Drop emails that could not be stored; the rest keep their render data
+            stored = [(email, item) for email, item in zip(created, rendered) if email is not None]
+            emails = [email for email, _ in stored]
+            rendered = [item for _, item in stored]
+            failed = len(created) - len(stored)
+
+            # --- Stage 3: capture missing screenshots concurrently ---
+            job_list = self._thumbnail_jobs(emails, rendered, profiles)
+            updates: dict[int, dict] = {}
+            if wait_for_thumbnails:
+                updates = await self._capture_stored(db, job_list)
+            else:
+                self._schedule_thumbnails(job_list)
+
+            results = [self._email_result(email, updates.get(email.id, {})) for email in emails]
+            return {
+                'generated': len(results),
+                'rendered': len(rendered) + failed,
+                'skipped': skipped,
+                'failed': failed,
+                'emails': results,
+            }
+
         except Exception as e:
             print(f"Error generating emails: {e}")
             await db.rollback()
-            return None
+            raise
+
+    async def stream_emails(
+        self,
+        db: AsyncSession,
+        project_id: int,
+        profiles: list[str] | None = None,
+        force: bool = False,
+        include_html: bool = False,
+    ) -> AsyncIterator[dict]:
+        """Generate like ``generate_emails`` but yield one event per finished email.
+
+        The render engine hands over results a chunk at a time; they are
+        persisted and screenshotted ``stream_chunk_size`` at a time and
+        dropped once their events are out, so memory stays flat however
+        large the project or any one template's locale list is. Yields ``{'event': 'email', ...}`` per
+        email, ``{'event': 'error', ...}`` per email that could not be
+        stored and a final ``{'event': 'summary', ...}`` with the counts.
+        """
+        profiles = resolve_profiles(profiles)
+        project = await self.project_repository.get(db, project_id)
+        if project is None:
+            yield {'event': 'error', 'message': 'Project not found'}
+            return
+
+        stats = {'generated': 0, 'rendered': 0, 'skipped': 0, 'failed': 0}
+        templates = await self.template_repository.get_by_project(db, project_id)
+        copies = await self.localized_copy_repository.get_by_project(db, project_id)
+        if not templates or not copies:
+            yield {'event': 'summary', **stats}
+            return
+
+        previous = {} if force else await self.generated_email_repository.get_latest_fingerprints(db, project_id)
+        renders = self._iter_renders(db, templates, copies, project.locale_fallbacks, profiles, previous, stats)
+        chunk: list[dict] = []
+        try:
+            async for item in renders:
+                chunk.append(item)
+                if len(chunk) >= self.stream_chunk_size:
+                    async for event in self._stream_chunk(db, project_id, chunk, profiles, include_html, stats):
+                        yield event
+                    chunk = []
+            if chunk:
+                async for event in self._stream_chunk(db, project_id, chunk, profiles, include_html, stats):
+                    yield event
+        except Exception as e:
+            print(f"Error streaming emails: {e}")
+            await db.rollback()
+            yield {'event': 'error', 'message': str(e)}
+        yield {'event': 'summary', **stats}
+
+    async def _stream_chunk(
+        self, db: AsyncSession, project_id: int, chunk: list[dict], profiles: list[str], include_html: bool, stats: dict
+    ) -> AsyncIterator[dict]:
+        """Persist and screenshot one chunk of renders, then yield its events."""
+        emails = [self._new_email(project_id, item, profiles) for item in chunk]
+        started = time.perf_counter()
+        created = await self.generated_email_repository.create_many(db, emails)
+        db_write_ms = round((time.perf_counter() - started) * 1000, 1)
+        stats['rendered'] += len(chunk)
+
+        stored = []
+        for email, item in zip(created, chunk):
+            if email is None:
+                stats['failed'] += 1
+                yield {'event': 'error', 'template_id': item['template_id'], 'locale': item['locale'],
+                       'message': 'Could not store generated email'}
+            else:
+                stored.append((email, item))
+        if not stored:
+            return
+
+        started = time.perf_counter()
+        updates = await self._capture_stored(
+            db, self._thumbnail_jobs([email for email, _ in stored], [item for _, item in stored], profiles)
+        )
+        screenshot_ms = round((time.perf_counter() - started) * 1000, 1)
+
+        for email, item in stored:
+            stats['generated'] += 1
+            result = self._email_result(email, updates.get(email.id, {}))
+            if not include_html:
+                del result['html_content']
+            # Storing and screenshotting happen per chunk, so those timings are shared
+            result['timings'] = {
+                'render_ms': item['render_ms'],
+                'db_write_ms': db_write_ms,
+                'screenshot_ms': screenshot_ms,
+            }
+            yield {'event': 'email', **result}
+
+    def _new_email(self, project_id: int, item: dict, profiles: list[str]) -> GeneratedEmail:
+        """Build the row for one render, reusing any screenshots already cached."""
+        item['screenshot_keys'] = self._profile_keys(item['html'], profiles)
+        renders = {}
+        for name, key in item['screenshot_keys'].items():
+            path = self.screenshot_cache.lookup(key)
+            renders[name] = {'screenshot_url': self.screenshot_cache.url(key), 'status': 'done' if path else 'pending'}
+            if path:
+                # Cached screenshots may predate their thumbnails or have lost them
+                renders[name]['variants'] = self.thumbnail_service.existing_variants(path)
+        primary = renders[profiles[0]]
+        return GeneratedEmail(
+            project_id=project_id,
+            template_id=item['template_id'],
+            language=item['locale'],  # keep field name for now
+            html_content=item['html'],
+            thumbnail_url=primary['screenshot_url'],
+            thumbnail_status=primary['status'],
+            renders=renders,
+            input_fingerprint=item['fingerprint'],
+        )
+
+    @staticmethod
+    def _thumbnail_jobs(
+        emails: list[GeneratedEmail], rendered: list[dict], profiles: list[str]
+    ) -> list[tuple[str, list[tuple[str, str]], dict, list[int]]]:
+        """Group stored emails that still need screenshots into capture jobs."""
+        # Identical renders share their screenshots, so load each document once
+        jobs: dict[str, tuple[str, list[tuple[str, str]], dict, list[int]]] = {}
+        for email, item in zip(emails, rendered):
+            captures = [
+                (name, item['screenshot_keys'][name])
+                for name, render in email.renders.items()
+                if render['status'] == 'pending'
+            ]
+            if not captures:
+                continue
+            group = item['screenshot_keys'][profiles[0]]
+            if group not in jobs:
+                jobs[group] = (item['html'], captures, email.renders, [])
+            jobs[group][3].append(email.id)
+        return list(jobs.values())
+
+    def _email_result(self, email: GeneratedEmail, update: dict) -> dict:
+        return {
+            'id': email.id,
+            'template_id': email.template_id,
+            'locale': email.language,
+            'html_content': email.html_content,
+            'generated_at': datetime.utcnow().isoformat(),
+            **self.thumbnail_urls(
+                email.thumbnail_url,
+                update.get('thumbnail_status', email.thumbnail_status),
+                update.get('renders', email.renders),
+            ),
+            'screenshot_url': email.thumbnail_url,
+            'thumbnail_status': update.get('thumbnail_status', email.thumbnail_status),
+            'renders': self.render_urls(update.get('renders', email.renders)),
+        }
+
+    @staticmethod
+    def _copy_hash(locale_copy: dict) -> str:
+        encoded = json.dumps(locale_copy, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def input_fingerprint(template_hash: str, copy_hash: str, profiles: list[str]) -> str:
+        """Fingerprint of everything that shapes a generated email."""
+        return hashlib.sha256(f"{template_hash}:{copy_hash}:{','.join(profiles)}".encode('utf-8')).hexdigest()
+
+    async def _render_all(
+        self,
+        db: AsyncSession,
+        templates,
+        copies,
+        locale_fallbacks: dict | None = None,
+        profiles: list[str] | None = None,
+        previous: dict | None = None,
+    ) -> tuple[list[dict], int]:
+        """Render every template for every locale that has complete copy.
+
+        Pairs whose fingerprint matches ``previous`` are skipped; returns the
+        rendered items and the number of skipped pairs.
+        """
+        stats = {'skipped': 0}
+        rendered = [
+            item async for item in
+            self._iter_renders(db, templates, copies, locale_fallbacks, profiles, previous, stats)
+        ]
+        return rendered, stats['skipped']
+
+    async def _iter_renders(
+        self,
+        db: AsyncSession,
+        templates,
+        copies,
+        locale_fallbacks: dict | None,
+        profiles: list[str] | None,
+        previous: dict | None,
+        stats: dict,
+    ) -> AsyncIterator[dict]:
+        """Yield renders one at a time, counting unchanged pairs in ``stats['skipped']``."""
+        profiles = profiles or []
+        previous = previous or {}
+
+        # Index the copy once; each locale resolves through its fallback chain
+        # (e.g. fr-CA -> fr -> en) to a single dict
+        resolver = LocaleResolver(copies, locale_fallbacks)
+        copy_hashes = {locale: self._copy_hash(resolver.resolve(locale)) for locale in resolver.locales}
+
+        # Plan every pair first; rendering is then handed to the render engine
+        # one template at a time, inline or on worker processes
+        tasks: list[RenderTask] = []
+        plans: list[tuple[int, list[str]]] = []
+        for template in templates:
+            # Get placeholders for this template
+            placeholder_keys = await self.placeholder_repository.get_keys_by_template(db, getattr(template, 'id'))
+            placeholders = {str(key) for key in placeholder_keys}
+            source = str(template.content)
+            template_hash = template_cache.key(source)
+            jobs, fingerprints = [], []
+
+            for locale in resolver.locales:
+                locale_copy = resolver.resolve(locale)
+
+                # Check if we have all required placeholders for this locale
+                if not placeholders.issubset(locale_copy.keys()):
+                    continue
+
+                fingerprint = self.input_fingerprint(template_hash, copy_hashes[locale], profiles)
+                if previous.get((template.id, locale)) == fingerprint:
+                    stats['skipped'] += 1
+                    continue
+                jobs.append((locale, locale_copy))
+                fingerprints.append(fingerprint)
+
+            tasks.append(RenderTask(source, jobs, getattr(template, 'segments', None)))
+            plans.append((template.id, fingerprints))
+
+        # Results arrive a chunk at a time, in job order within each template
+        offsets = [0] * len(tasks)
+        async for index, results in render_engine.render(tasks):
+            template_id, fingerprints = plans[index]
+            start, offsets[index] = offsets[index], offsets[index] + len(results)
+            jobs = tasks[index].jobs[start:offsets[index]]
+            for (locale, _), fingerprint, (html, error, render_ms) in zip(jobs, fingerprints[start:], results):
+                if html is None:
+                    print(f"Error rendering template {template_id} for locale {locale}: {error}")
+                    continue
+                yield {
+                    'template_id': template_id,
+                    'locale': locale,
+                    'html': html,
+                    'fingerprint': fingerprint,
+                    'render_ms': render_ms,
+                }
+
+    def _profile_keys(self, html: str, profiles: list[str]) -> dict[str, str]:
+        return {
+            name: self.screenshot_cache.key(html, RENDER_PROFILES[name]['viewport'], **profile_cache_options(name))
+            for name in profiles
+        }
+
+    @staticmethod
+    def _variants(render: dict) -> list[str] | None:
+        """Derivatives recorded for a render; None (all) for rows stored before they were recorded."""
+        if render.get('status') != 'done':
+            return []
+        return render.get('variants')
+
+    def render_urls(self, renders: dict | None) -> dict:
+        """Add list thumbnail URLs to a stored ``renders`` mapping."""
+        return {
+            name: {
+                **render,
+                'thumbnail_url': self.thumbnail_service.list_url(render['screenshot_url'], self._variants(render)),
+            }
+            for name, render in (renders or {}).items()
+        }
+
+    def thumbnail_urls(self, screenshot_url: str | None, status: str | None, renders: dict | None) -> dict:
+        """List thumbnail and derivative URLs of an email's primary screenshot, without disk lookups."""
+        if renders:
+            variants = self._variants(next(iter(renders.values())))
+        else:
+            variants = None if status == 'done' else []
+        return {
+            'thumbnail_url': self.thumbnail_service.list_url(screenshot_url, variants),
+            'thumbnails': self.thumbnail_service.variant_urls(screenshot_url, variants),
+        }
+
+    async def capture_thumbnails(
+        self, db: AsyncSession, jobs: list[tuple[str, list[tuple[str, str]], dict, list[int]]]
+    ) -> dict[int, dict]:
+        """Capture (html, [(profile, cache_key)], renders, email_ids) jobs and record the results.
+
+        Returns the updated ``renders`` and thumbnail status per email id. The
+        thumbnail status follows the first profile of each email.
+        """
+        temp_paths = [
+            [(name, key, self.screenshot_cache.temp_path(key)) for name, key in captures]
+            for _, captures, _, _ in jobs
+        ]
+        outcomes = await worker_pool.map_chunks(
+            render_many,
+            [
+                (html, [(name, str(temp_path)) for name, _, temp_path in paths])
+                for (html, _, _, _), paths in zip(jobs, temp_paths)
+            ],
+            self.screenshot_concurrency,
+        )
+        updates: dict[int, dict] = {}
+        published: list[tuple[dict, Path]] = []
+        for (_, _, renders, email_ids), paths, outcome in zip(jobs, temp_paths, outcomes):
+            renders = {name: dict(render) for name, render in renders.items()}
+            for name, key, temp_path in paths:
+                if outcome.get(name):
+                    published.append((renders[name], self.screenshot_cache.publish(temp_path, key)))
+                    renders[name]['status'] = 'done'
+                else:
+                    temp_path.unlink(missing_ok=True)
+                    renders[name]['status'] = 'failed'
+            status = next(iter(renders.values()))['status']
+            for email_id in email_ids:
+                updates[email_id] = {'id': email_id, 'renders': renders, 'thumbnail_status': status}
+        # Derive the compact list thumbnails from every new screenshot and
+        # record which exist, so listings never have to stat the files
+        created = await asyncio.gather(*(self.thumbnail_service.create(path) for _, path in published))
+        for (render, _), names in zip(published, created):
+            render['variants'] = sorted(names)
+        await self.generated_email_repository.set_render_results(db, list(updates.values()))
+        return updates
+
+    async def _capture_stored(
+        self, db: AsyncSession, jobs: list[tuple[str, list[tuple[str, str]], dict, list[int]]]
+    ) -> dict[int, dict]:
+        """Capture thumbnails of emails that are already stored.
+
+        A capture failure leaves them 'pending' instead of failing the whole
+        run; the next generation re-renders them.
+        """
+        try:
+            return await self.capture_thumbnails(db, jobs)
+        except Exception as e:
+            print(f"Error capturing thumbnails: {e}")
+            await db.rollback()
+            return {}
+
+    def _schedule_thumbnails(self, jobs: list[tuple[str, list[tuple[str, str]], dict, list[int]]]):
+        """Capture thumbnails after the request returns, using a dedicated session."""
+        async def capture():
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self.capture_thumbnails(session, jobs)
+            except Exception as e:
+                print(f"Error capturing thumbnails in background: {e}")
+
+        task = asyncio.create_task(capture())
+        self._thumbnail_tasks[task] = {email_id for _, _, _, email_ids in jobs for email_id in email_ids}
+        task.add_done_callback(lambda done: self._thumbnail_tasks.pop(done, None))
+
+    async def wait_for_thumbnails(self, email_ids: list[int]):
+        """Wait until the background captures of the given emails have finished."""
+        wanted = set(email_ids)
+        tasks = [task for task, ids in self._thumbnail_tasks.items() if ids & wanted]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
 
+    async def get_thumbnail_statuses(self, db: AsyncSession, project_id: int) -> list[dict]:
+        rows = await self.generated_email_repository.get_thumbnail_statuses(db, project_id)
+        return [
+            {
+                'id': row.id,
+                'template_id': row.template_id,
+                'locale': row.language,
+                **self.thumbnail_urls(row.thumbnail_url, row.thumbnail_status, row.renders),
+                'screenshot_url': row.thumbnail_url,
+                'thumbnail_status': row.thumbnail_status,
+                'renders': self.render_urls(row.renders),
+            }
+            for row in rows
+        ]
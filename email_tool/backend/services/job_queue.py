@@ -0,0 +1,115 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class Job:
+    """A unit of background work and its lifecycle timestamps."""
+
+    def __init__(self, kind: str, func: Callable[..., Awaitable[Any]], args: tuple):
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.func = func
+        self.args = args
+        self.status = 'queued'
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._enqueued = time.perf_counter()
+        self.queue_ms: Optional[int] = None
+        self.run_ms: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'queue_ms': self.queue_ms,
+            'run_ms': self.run_ms,
+        }
+
+
+class JobQueue:
+    """In-process async job queue with a fixed pool of worker tasks.
+
+    Jobs move through queued -> running -> done/failed. Only the most recent
+    ``history_size`` jobs are kept for status lookups.
+    """
+
+    def __init__(self, workers: Optional[int] = None, history_size: int = 1000):
+        self.worker_count = workers or int(os.getenv('JOB_QUEUE_WORKERS', '2'))
+        self.history_size = history_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self.started:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def enqueue(self, kind: str, func: Callable[..., Awaitable[Any]], *args: Any) -> str:
+        """Queue ``await func(*args)`` and return the job id immediately."""
+        if not self.started:
+            await self.start()
+        job = Job(kind, func, args)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.history_size:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status in ('queued', 'running'):
+                break
+            del self._jobs[oldest_id]
+        self._queue.put_nowait(job)
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return job.to_dict() if job else None
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            job.status = 'running'
+            job.started_at = datetime.utcnow()
+            started = time.perf_counter()
+            job.queue_ms = int((started - job._enqueued) * 1000)
+            try:
+                job.result = await job.func(*job.args)
+                job.status = 'done'
+            except asyncio.CancelledError:
+                job.status = 'failed'
+                job.error = 'Cancelled'
+                raise
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.utcnow()
+                job.run_ms = int((time.perf_counter() - started) * 1000)
+                self._queue.task_done()
+
+
+# Shared queue for background work such as preview rendering
+job_queue = JobQueue()
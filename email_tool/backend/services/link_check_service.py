@@ -0,0 +1,87 @@
+import time
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from email_tool.playwright.link_checker import LinkChecker, extract_links
+from ..data_access.generated_email_repository import GeneratedEmailRepository
+from ..data_access.link_check_result_repository import LinkCheckResultRepository
+
+
+class LinkCheckService:
+    """Check that the links in a project's generated emails are reachable."""
+
+    def __init__(self, link_checker: LinkChecker | None = None):
+        self.generated_email_repository = GeneratedEmailRepository()
+        self.link_check_result_repository = LinkCheckResultRepository()
+        # One checker per service keeps its result cache across requests
+        self.link_checker = link_checker or LinkChecker()
+
+    async def check_project(self, db: AsyncSession, project_id: int) -> dict:
+        """Check every unique link across the project's current emails and store a result per link.
+
+        Only the newest email of each (template, locale) counts; links that
+        only older generations contained are no longer sent anywhere.
+        """
+        started = time.perf_counter()
+        emails = await self.generated_email_repository.get_latest_by_project(db, project_id)
+
+        email_ids_by_url: dict[str, list[int]] = {}
+        for email in emails:
+            for url in extract_links(str(email.html_content)):
+                email_ids_by_url.setdefault(url, []).append(email.id)
+
+        results = await self.link_checker.check_many(email_ids_by_url)
+
+        checked_at = datetime.utcnow()
+        links = []
+        for url, email_ids in email_ids_by_url.items():
+            result = results[url]
+            links.append({
+                'url': url,
+                'host': result['host'],
+                'status_code': result['status_code'],
+                'ok': result['ok'],
+                'final_url': result['final_url'],
+                'error': result['error'],
+                'elapsed_ms': result['elapsed_ms'],
+                'cached': result['cached'],
+                'generated_email_ids': email_ids,
+            })
+        await self.link_check_result_repository.bulk_create(db, [
+            {
+                'project_id': project_id,
+                'checked_at': checked_at,
+                **{key: value for key, value in link.items() if key != 'cached'},
+            }
+            for link in links
+        ])
+
+        return {
+            'emails': len(emails),
+            'checked': len(links),
+            'broken': sum(1 for link in links if not link['ok']),
+            'cached': sum(1 for link in links if link['cached']),
+            'duration_ms': int((time.perf_counter() - started) * 1000),
+            'links': links,
+        }
+
+    async def get_latest_results(self, db: AsyncSession, project_id: int) -> list[dict]:
+        """Results of the most recent link check of a project."""
+        rows = await self.link_check_result_repository.get_by_project(db, project_id)
+        if not rows:
+            return []
+        latest = rows[0].checked_at
+        return [
+            {
+                'url': row.url,
+                'host': row.host,
+                'status_code': row.status_code,
+                'ok': row.ok,
+                'final_url': row.final_url,
+                'error': row.error,
+                'elapsed_ms': row.elapsed_ms,
+                'generated_email_ids': row.generated_email_ids,
+                'checked_at': row.checked_at.isoformat(),
+            }
+            for row in rows
+            if row.checked_at == latest
+        ]
@@ -0,0 +1,67 @@
+from typing import Dict, Iterable, List, Optional
+
+# Locale every chain ends in unless a project configures otherwise
+DEFAULT_LOCALE = 'en'
+
+
+def fallback_chain(locale: str, overrides: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """Locales to look a key up in, most specific first.
+
+    By default ``fr-CA`` resolves through ``fr-CA -> fr -> en``. A project
+    can replace the fallbacks of any locale, e.g. ``{"fr-CA": ["fr-FR"]}``.
+    """
+    if overrides and locale in overrides:
+        fallbacks = list(overrides[locale])
+    else:
+        fallbacks = []
+        if '-' in locale:
+            fallbacks.append(locale.split('-')[0])
+        fallbacks.append(DEFAULT_LOCALE)
+    return list(dict.fromkeys([locale, *fallbacks]))
+
+
+def validate_fallbacks(fallbacks: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Normalise a project's fallback configuration, raising ValueError when it is malformed."""
+    if not isinstance(fallbacks, dict):
+        raise ValueError('Locale fallbacks must map a locale to a list of locales')
+    cleaned = {}
+    for locale, chain in fallbacks.items():
+        if not isinstance(chain, list) or not all(isinstance(item, str) and item.strip() for item in chain):
+            raise ValueError(f"Fallbacks for '{locale}' must be a list of locale codes")
+        cleaned[locale.strip()] = [item.strip() for item in chain]
+    return cleaned
+
+
+class LocaleResolver:
+    """Index a project's copy once and resolve each locale's fallback chain.
+
+    The copy rows are grouped into a locale -> {key: value} map in a single
+    pass; resolving a locale then merges at most a few dicts, and the result
+    is memoised so every template reuses it.
+    """
+
+    def __init__(self, copies: Iterable, overrides: Optional[Dict[str, List[str]]] = None):
+        self.overrides = overrides or {}
+        self.index: Dict[str, Dict[str, str]] = {}
+        for copy in copies:
+            self.index.setdefault(copy.locale, {})[str(copy.key)] = str(copy.value)
+        self._resolved: Dict[str, Dict[str, str]] = {}
+
+    @property
+    def locales(self) -> List[str]:
+        """Locales that have copy of their own, in the order first seen."""
+        return list(self.index)
+
+    def chain(self, locale: str) -> List[str]:
+        return fallback_chain(locale, self.overrides)
+
+    def resolve(self, locale: str) -> Dict[str, str]:
+        """Copy for ``locale`` with missing keys filled from its fallbacks."""
+        resolved = self._resolved.get(locale)
+        if resolved is None:
+            resolved = {}
+            # Merge least specific first so more specific locales win
+            for fallback in reversed(self.chain(locale)):
+                resolved.update(self.index.get(fallback, {}))
+            self._resolved[locale] = resolved
+        return resolved
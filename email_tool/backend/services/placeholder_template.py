@@ -0,0 +1,39 @@
+import re
+from typing import Dict, List, Optional
+
+# Same pattern TemplateService uses to extract placeholder keys (allows hyphens)
+PLACEHOLDER_PATTERN = re.compile(r"{{\s*([\w-]+)\s*}}")
+# Anything Jinja would still interpret once the simple placeholders are removed
+JINJA_SYNTAX = re.compile(r"{{|{%|{#")
+_NEWLINES = re.compile(r"\r\n|\r|\n")
+# Keys Jinja reads as literals rather than variables
+_JINJA_LITERALS = {'true', 'false', 'none', 'True', 'False', 'None'}
+
+
+def compile_segments(source: str) -> Optional[List[str]]:
+    """Compile a template that only uses ``{{ key }}`` into ``[literal, key, literal, ...]``.
+
+    Even positions are literal text and odd positions are copy keys, so the
+    list always has odd length. Returns None when the template uses any
+    other Jinja syntax and has to be rendered by Jinja.
+
+    Literals are normalised the way Jinja's defaults do it: newlines become
+    ``\\n`` and a single trailing newline is dropped. This keeps the output
+    identical to the Jinja path.
+    """
+    parts = PLACEHOLDER_PATTERN.split(source)
+    if any(JINJA_SYNTAX.search(literal) for literal in parts[::2]):
+        return None
+    if any(not (key[0].isalpha() or key[0] == '_') or key in _JINJA_LITERALS for key in parts[1::2]):
+        return None
+    segments = [_NEWLINES.sub('\n', part) if index % 2 == 0 else part for index, part in enumerate(parts)]
+    if segments[-1].endswith('\n'):
+        segments[-1] = segments[-1][:-1]
+    return segments
+
+
+def render_segments(segments: List[str], copy: Dict[str, str]) -> str:
+    """Fill compiled segments with copy; missing keys render empty, like Jinja."""
+    parts = list(segments)
+    parts[1::2] = [copy.get(key, '') for key in segments[1::2]]
+    return ''.join(parts)
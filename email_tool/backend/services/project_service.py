@@ -5,6 +5,7 @@ from ..data_access.project_repository import ProjectRepository
 from ..data_access.template_repository import TemplateRepository
 from ..data_access.localized_copy_repository import LocalizedCopyRepository
 from typing import Optional, List, Dict, Any
+from .locale_resolver import validate_fallbacks
 
 class ProjectService:
     def __init__(self):
@@ -36,6 +37,16 @@ class ProjectService:
             return await self.project_repository.update(db, project)
         return None
 
+    async def update_locale_fallbacks(
+        self, db: AsyncSession, project_id: int, fallbacks: Dict[str, List[str]]
+    ) -> Project | None:
+        """Replace the per-locale fallback chains used when generating emails"""
+        project = await self.project_repository.get(db, project_id)
+        if project:
+            project.locale_fallbacks = validate_fallbacks(fallbacks) or None
+            return await self.project_repository.update(db, project)
+        return None
+
     async def get_project(self, db: AsyncSession, project_id: int) -> Project | None:
         """Get a project by ID"""
         return await self.project_repository.get(db, project_id)
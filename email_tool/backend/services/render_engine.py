@@ -0,0 +1,163 @@
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from email_tool.backend.services.placeholder_template import render_segments
+from email_tool.backend.services.template_cache import template_cache
+
+# One render job: (key, copy) where key identifies the job to the caller
+RenderJob = Tuple[object, Dict[str, str]]
+# One render result: (html, error, render_ms); html is None when rendering failed
+RenderResult = Tuple[Optional[str], Optional[str], float]
+
+RENDER_MODES = ('auto', 'serial', 'process')
+
+
+class RenderTask(NamedTuple):
+    """One template with the copies to render it with.
+
+    ``segments`` holds the template precompiled by ``compile_segments``;
+    when it is set, the template is rendered without Jinja.
+    """
+    source: str
+    jobs: Sequence[RenderJob]
+    segments: Optional[List[str]] = None
+
+
+def render_chunk(source: str, jobs: Sequence[RenderJob], segments: Optional[List[str]] = None) -> List[RenderResult]:
+    """Render one template for each job's copy.
+
+    Runs in the API process for serial renders and in a worker process
+    otherwise. Plain ``{{ key }}`` templates are filled from their
+    segments; others compile once per process through its own
+    ``template_cache``, so a worker sent many chunks of the same template
+    reuses the compiled code.
+    """
+    template = None
+    if segments is None:
+        try:
+            template = template_cache.get(source)
+        except Exception as e:
+            return [(None, f"compile error: {e}", 0.0) for _ in jobs]
+    results: List[RenderResult] = []
+    for _, copy in jobs:
+        started = time.perf_counter()
+        try:
+            if template is None:
+                html = render_segments(segments, copy)
+            else:
+                html = template.render(**copy)
+            error = None
+        except Exception as e:
+            html, error = None, str(e)
+        results.append((html, error, round((time.perf_counter() - started) * 1000, 1)))
+    return results
+
+
+class RenderEngine:
+    """Render templates either inline or on a pool of worker processes.
+
+    Rendering is CPU-bound, so large runs go to ``workers`` spawned
+    processes and leave the event loop free. Work is chunked by template,
+    so each chunk ships one template source and up to ``chunk_size``
+    copies. Small runs stay inline, where the pickling overhead would
+    outweigh the gain. In ``auto`` mode a run is sent to the pool once its
+    estimated output (template size x renders) reaches ``threshold`` bytes.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        mode: Optional[str] = None,
+        threshold: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        self.workers = workers if workers is not None else int(
+            os.getenv('RENDER_WORKERS', str(max(1, (os.cpu_count() or 2) - 1)))
+        )
+        self.mode = mode or os.getenv('RENDER_MODE', 'auto')
+        if self.mode not in RENDER_MODES:
+            raise ValueError(f"Unknown render mode '{self.mode}'. Available: {', '.join(RENDER_MODES)}")
+        self.threshold = threshold if threshold is not None else int(os.getenv('RENDER_PROCESS_THRESHOLD', '2000000'))
+        self.chunk_size = chunk_size or int(os.getenv('RENDER_CHUNK_SIZE', '50'))
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def choose_mode(self, tasks: Sequence[RenderTask]) -> str:
+        """Return 'serial' or 'process' for a run of tasks."""
+        if self.workers <= 0 or self.mode == 'serial':
+            return 'serial'
+        if self.mode == 'process':
+            return 'process'
+        estimated = sum(len(task.source) * len(task.jobs) for task in tasks)
+        return 'process' if estimated >= self.threshold else 'serial'
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers start clean instead of inheriting the API's event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    async def stop(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+    async def _render_in_worker(self, source: str, jobs: List[RenderJob], segments: Optional[List[str]]) -> List[RenderResult]:
+        executor = self._get_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, render_chunk, source, jobs, segments)
+        except BrokenProcessPool:
+            # Replace the pool for later chunks and finish this one inline
+            print("Render worker crashed; restarting the render pool", file=sys.stderr)
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            return render_chunk(source, jobs, segments)
+
+    async def render(self, tasks: Sequence[RenderTask]) -> AsyncIterator[Tuple[int, List[RenderResult]]]:
+        """Yield ``(task_index, results)`` per chunk of up to ``chunk_size`` jobs, in job order.
+
+        A task's chunks follow each other, so callers match results to jobs
+        by keeping an offset per task. Nothing is held back between chunks;
+        in process mode at most two chunks per worker are in flight, so a
+        run's memory is bounded by the chunks in progress rather than its size.
+        """
+        chunks = [
+            (index, task, start)
+            for index, task in enumerate(tasks)
+            for start in range(0, len(task.jobs), self.chunk_size)
+        ]
+        if self.choose_mode(tasks) == 'serial':
+            for index, task, start in chunks:
+                yield index, render_chunk(task.source, list(task.jobs[start:start + self.chunk_size]), task.segments)
+            return
+
+        pending = deque()
+        next_chunk = 0
+        try:
+            while pending or next_chunk < len(chunks):
+                while next_chunk < len(chunks) and len(pending) < self.workers * 2:
+                    index, task, start = chunks[next_chunk]
+                    # Segment templates never reach Jinja, so their source need not be shipped
+                    source = '' if task.segments is not None else task.source
+                    jobs = list(task.jobs[start:start + self.chunk_size])
+                    pending.append((index, asyncio.ensure_future(self._render_in_worker(source, jobs, task.segments))))
+                    next_chunk += 1
+                index, future = pending.popleft()
+                yield index, await future
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+# Shared render engine for email generation
+render_engine = RenderEngine()
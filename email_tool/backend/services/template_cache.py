@@ -0,0 +1,69 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Optional
+from jinja2 import BaseLoader, Environment, FileSystemBytecodeCache, Template, TemplateNotFound
+
+
+class _ContentHashLoader(BaseLoader):
+    """Serve template sources registered under the SHA-256 of their content.
+
+    A name always maps to the same source, so compiled templates never go
+    stale and Jinja's caches can keep them for as long as they like.
+    """
+
+    def __init__(self, max_sources: int):
+        self.max_sources = max_sources
+        self._sources: "OrderedDict[str, str]" = OrderedDict()
+
+    def register(self, name: str, source: str):
+        self._sources[name] = source
+        self._sources.move_to_end(name)
+        while len(self._sources) > self.max_sources:
+            self._sources.popitem(last=False)
+
+    def get_source(self, environment, name):
+        source = self._sources.get(name)
+        if source is None:
+            raise TemplateNotFound(name)
+        return source, None, lambda: True
+
+
+class TemplateCache:
+    """Shared Jinja environment that compiles every template version once.
+
+    Compiled templates live in the environment's LRU cache, keyed by the
+    hash of their source. When ``TEMPLATE_BYTECODE_CACHE_DIR`` is set the
+    compiled bytecode is also written there, so other worker processes and
+    restarts skip compilation as well.
+    """
+
+    def __init__(self, cache_size: Optional[int] = None, bytecode_cache_dir: Optional[str] = None):
+        cache_size = cache_size or int(os.getenv('TEMPLATE_CACHE_SIZE', '256'))
+        bytecode_cache_dir = bytecode_cache_dir or os.getenv('TEMPLATE_BYTECODE_CACHE_DIR')
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        self._loader = _ContentHashLoader(cache_size)
+        # Same defaults as jinja2.Template(source), so rendered output is unchanged
+        self.environment = Environment(
+            loader=self._loader,
+            cache_size=cache_size,
+            auto_reload=False,
+            bytecode_cache=bytecode_cache,
+        )
+
+    @staticmethod
+    def key(source: str) -> str:
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def get(self, source: str) -> Template:
+        """Return the compiled template for ``source``, compiling it only on first use."""
+        name = self.key(source)
+        self._loader.register(name, source)
+        return self.environment.get_template(name)
+
+
+# Shared cache for all email rendering in this process
+template_cache = TemplateCache()
@@ -1,34 +1,44 @@
 import asyncio
 import os
-import uuid
+import shutil
 from pathlib import Path
-from playwright.async_api import async_playwright
+from typing import Optional
+from email_tool.playwright.browser_pool import browser_pool
+from email_tool.playwright.screenshot_cache import ScreenshotCache
+from email_tool.playwright.page_settle import settle_page, DEFAULT_SETTLE_MODE
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..models.template import Template
 from ..models.placeholder import Placeholder
 from ..data_access.template_repository import TemplateRepository
 from ..data_access.placeholder_repository import PlaceholderRepository
+from .thumbnail_service import ThumbnailService
 
 class TemplateRenderService:
+    viewport = {"width": 800, "height": 600}
+
     def __init__(self):
         # Store screenshots alongside backend static assets
         self.screenshots_dir = Path(__file__).resolve().parent / 'static' / 'screenshots'
-        self.screenshots_dir.mkdir(parents=True, exist_ok=True)
+        self.screenshot_cache = ScreenshotCache(self.screenshots_dir)
+        self.thumbnail_service = ThumbnailService(self.screenshots_dir)
         self.template_repository = TemplateRepository()
         self.placeholder_repository = PlaceholderRepository()
     
-    async def render_template_to_image(self, db: AsyncSession, template_id: int) -> str:
-        """Render a template to an image and return the file path"""
+    async def render_template_to_image(
+        self, db: AsyncSession, template_id: int, settle_mode: Optional[str] = None, force: bool = False
+    ) -> tuple[str, Optional[float]]:
+        """Render a template to an image and return the file name and settle time in ms.
+
+        The settle time is None when the preview was served from the cache.
+        ``force`` bypasses the cache and replaces the stored image, for when
+        remote assets or fonts changed behind the same HTML.
+        """
         # Get template from database using repository
         template = await self.template_repository.get(db, template_id)
         if not template:
             raise ValueError("Template not found")
         
-        # Generate unique filename
-        filename = f"{uuid.uuid4()}.png"
-        filepath = self.screenshots_dir / filename
-        
         # Create a temporary HTML file with the template content
         temp_html = f"""
         <!DOCTYPE html>
@@ -47,27 +57,37 @@ class TemplateRenderService:
         </html>
         """
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
+        # Identical previews are stored once, keyed by their content
+        settle_mode = settle_mode or DEFAULT_SETTLE_MODE
+        key = self.screenshot_cache.key(temp_html, self.viewport, full_page=True, settle=settle_mode)
+        filename = self.screenshot_cache.filename(key)
+        if not force and self.screenshot_cache.lookup(key):
+            return filename, None
+        temp_path = self.screenshot_cache.temp_path(key)
+        
+        try:
             # Set viewport size for consistent rendering
-            await page.set_viewport_size({"width": 800, "height": 600})
-            
-            # Load the HTML content
-            await page.set_content(temp_html)
-            
-            # Wait for any dynamic content to load
-            await page.wait_for_timeout(1000)
-            
-            # Take screenshot
-            await page.screenshot(path=str(filepath), full_page=True)
-            await browser.close()
+            # A forced render also refetches remote assets that may have changed
+            async with browser_pool.page(viewport=self.viewport, refresh_assets=force) as page:
+                # Load the HTML content
+                await page.set_content(temp_html)
+                
+                # Wait only as long as the content needs to settle
+                settle_ms = await settle_page(page, settle_mode)
+                
+                # Take screenshot
+                await page.screenshot(path=str(temp_path), full_page=True)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self.screenshot_cache.publish(temp_path, key)
         
-        return filename
+        return filename, settle_ms
     
-    async def get_template_preview(self, db: AsyncSession, template_id: int) -> dict:
-        """Get template preview with rendered image"""
+    async def get_template_preview(
+        self, db: AsyncSession, template_id: int, settle_mode: Optional[str] = None, force: bool = False
+    ) -> dict:
+        """Get template preview with rendered image, re-rendering it from scratch with ``force``"""
         # Get template using repository
         template = await self.template_repository.get(db, template_id)
         if not template:
@@ -78,29 +98,48 @@ class TemplateRenderService:
         placeholders = [key for key in placeholder_keys]
         
         # Check if preview image already exists
-        existing_files = list(self.screenshots_dir.glob(f"template_{template_id}_*.png"))
-        if existing_files:
-            # Use existing preview
-            filename = existing_files[0].name
+        existing_files = [] if force else [file.name for file in self.screenshots_dir.glob(f"template_{template_id}_*")]
+        previews = [name for name in existing_files if name.endswith('.png')]
+        settle_ms = None
+        if previews:
+            # Use existing preview, with whichever thumbnails were made for it
+            filename = previews[0]
+            variants = self.thumbnail_service.existing_variants(Path(filename), existing_files)
         else:
             # Generate new preview
-            filename = await self.render_template_to_image(db, template_id)
-            # Rename to include template ID for easier management
+            filename, settle_ms = await self.render_template_to_image(db, template_id, settle_mode, force)
+            # Link under a name including the template ID for easier management,
+            # keeping the content-addressed original in the cache
             new_filename = f"template_{template_id}_{filename}"
-            os.rename(self.screenshots_dir / filename, self.screenshots_dir / new_filename)
+            if force:
+                # Drop an alias still linked to the replaced image
+                (self.screenshots_dir / new_filename).unlink(missing_ok=True)
+            self._link(self.screenshots_dir / filename, self.screenshots_dir / new_filename)
             filename = new_filename
+            variants = list(await self.thumbnail_service.create(self.screenshots_dir / filename))
+        preview_url = f"/static/screenshots/{filename}"
         
         return {
             'template_id': template_id,
             'filename': template.filename,
             'content': template.content,
             'placeholders': placeholders,
-            'preview_image': f"/static/screenshots/{filename}",
+            'preview_image': preview_url,
+            'preview_thumbnails': self.thumbnail_service.variant_urls(preview_url, variants),
+            'settle_ms': round(settle_ms) if settle_ms is not None else None,
             'created_at': template.created_at.isoformat()
         }
     
+    def _link(self, source: Path, target: Path):
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copyfile(source, target)
+
     async def delete_template_previews(self, template_id: int):
-        """Delete all preview images for a template"""
-        pattern = f"template_{template_id}_*.png"
+        """Delete all preview images and their thumbnails for a template"""
+        pattern = f"template_{template_id}_*"
         for file in self.screenshots_dir.glob(pattern):
             file.unlink() 
\ No newline at end of file
@@ -1,4 +1,3 @@
-import re
 import os
 from pathlib import Path
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,6 +7,8 @@ from ..data_access.project_repository import ProjectRepository
 from ..data_access.template_repository import TemplateRepository
 from ..data_access.placeholder_repository import PlaceholderRepository
 from .tag_service import TagService
+from .thumbnail_service import ThumbnailService
+from .placeholder_template import PLACEHOLDER_PATTERN, compile_segments
 from typing import Optional
 
 
@@ -19,6 +20,7 @@ class TemplateService:
         self.project_repository = ProjectRepository()
         self.template_repository = TemplateRepository()
         self.placeholder_repository = PlaceholderRepository()
+        self.thumbnail_service = ThumbnailService()
 
     async def upload_template(
         self,
@@ -32,11 +34,18 @@ class TemplateService:
         if not project:
             return None, [], []
         
-        template = Template(project_id=project_id, marketing_group_id=marketing_group_id, filename=filename, content=content)
+        # Plain {{key}} templates render from segments and skip Jinja entirely
+        template = Template(
+            project_id=project_id,
+            marketing_group_id=marketing_group_id,
+            filename=filename,
+            content=content,
+            segments=compile_segments(content),
+        )
         template = await self.template_repository.create(db, template)
         
         # Extract placeholder keys (allow hyphens)
-        keys = set(re.findall(r"{{\s*([\w-]+)\s*}}", content))
+        keys = set(PLACEHOLDER_PATTERN.findall(content))
         
         # Create placeholders and auto-create tags
         created_tags = []
@@ -79,10 +88,17 @@ class TemplateService:
             
             # Check for existing preview image
             preview_image = None
+            preview_image_full = None
             if screenshots_dir.exists():
-                existing_files = list(screenshots_dir.glob(f"template_{template_id}_*.png"))
-                if existing_files:
-                    preview_image = f"/static/screenshots/{existing_files[0].name}"
+                # One glob finds the preview and whichever thumbnails exist for it
+                existing_files = [file.name for file in screenshots_dir.glob(f"template_{template_id}_*")]
+                previews = [name for name in existing_files if name.endswith('.png')]
+                if previews:
+                    preview_image_full = f"/static/screenshots/{previews[0]}"
+                    # Lists get the compact thumbnail instead of the full-page PNG,
+                    # falling back to the PNG for previews without thumbnails
+                    variants = self.thumbnail_service.existing_variants(Path(previews[0]), existing_files)
+                    preview_image = self.thumbnail_service.list_url(preview_image_full, variants)
             
             template_dict = {
                 'id': template_id,
@@ -91,7 +107,8 @@ class TemplateService:
                 'content': template.content,
                 'created_at': template.created_at.isoformat(),
                 'placeholders': placeholders,
-                'preview_image': preview_image
+                'preview_image': preview_image,
+                'preview_image_full': preview_image_full
             }
             template_list.append(template_dict)
         
@@ -1,19 +1,72 @@
-import re
+import os
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..models import GeneratedEmail, PlaywrightResult
 from ..data_access.generated_email_repository import GeneratedEmailRepository
-from ...playwright.test_runner import run as run_test
+from ..data_access.playwright_result_repository import PlaywrightResultRepository
+from ...playwright.test_runner import run_many, needs_browser
+from ...playwright.worker_pool import worker_pool
+from ...playwright.phase_timer import summarize_timings
+from ...playwright.static_checks import validate_many
 from typing import Optional, List, Dict, Any
 
 
 class TestService:
     """Execute Playwright tests against generated emails."""
 
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None):
         self.generated_email_repository = GeneratedEmailRepository()
+        self.playwright_result_repository = PlaywrightResultRepository()
+        self.concurrency = concurrency or int(os.getenv('TEST_CONCURRENCY', '8'))
 
-    async def run_tests(self, db: AsyncSession, project_id: int, test_config: Optional[Dict[str, Any]] = None) -> int:
+    async def _test_in_browser(
+        self,
+        emails: List[GeneratedEmail],
+        test_steps: Optional[List[Dict[str, Any]]],
+        concurrency: int,
+    ) -> List[Dict[str, Any]]:
+        """Run the browser checks, spread over the browser worker processes when configured."""
+        checked = await worker_pool.map_chunks(
+            run_many, [(str(email.html_content), test_steps) for email in emails], concurrency
+        )
+        return [
+            {
+                'generated_email_id': email.id,
+                'passed': result['passed'],
+                'issues': result['issues'],
+                'duration_ms': result['duration_ms'],
+                'timings': result['timings'],
+            }
+            for email, result in zip(emails, checked)
+        ]
+
+    async def _check_statically(self, emails: List[GeneratedEmail]) -> List[Dict[str, Any]]:
+        """Run the browserless checks for the whole project at once."""
+        checked = await validate_many([str(email.html_content) for email in emails])
+        return [
+            {
+                'generated_email_id': email.id,
+                'passed': result['passed'],
+                'issues': result['issues'],
+                'duration_ms': result['duration_ms'],
+                'timings': {
+                    'total_ms': result['duration_ms'],
+                    'phases': {'static_checks': result['duration_ms']},
+                    'steps': [],
+                },
+            }
+            for email, result in zip(emails, checked)
+        ]
+
+    async def run_tests(
+        self,
+        db: AsyncSession,
+        project_id: int,
+        test_config: Optional[Dict[str, Any]] = None,
+        concurrency: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
         emails = await self.generated_email_repository.get_by_project(db, project_id)
         
         # Extract test steps from config if provided
@@ -21,18 +74,37 @@ class TestService:
         if test_config and 'steps' in test_config:
             test_steps = test_config['steps']
         
-        for email in emails:
-            test_result = await run_test(str(email.html_content), test_steps)
-            if re.search(r"{{\s*\w+\s*}}", str(email.html_content)):
-                test_result['passed'] = False
-                test_result['issues'].append('Unreplaced placeholders')
-            db.add(
-                PlaywrightResult(
-                    generated_email_id=email.id,
-                    passed=test_result['passed'],
-                    issues=test_result['issues'],
-                )
-            )
-        await db.commit()
-        return len(emails)
-
+        if needs_browser(test_steps):
+            # Check emails concurrently, never more than `concurrency` at once per process
+            results = await self._test_in_browser(emails, test_steps, concurrency or self.concurrency)
+        else:
+            results = await self._check_statically(emails)
+        
+        written = time.perf_counter()
+        await self.playwright_result_repository.bulk_create(
+            db,
+            [
+                {
+                    'generated_email_id': r['generated_email_id'],
+                    'passed': r['passed'],
+                    'issues': r['issues'],
+                    'timings': r['timings'],
+                }
+                for r in results
+            ],
+        )
+        db_write_ms = int((time.perf_counter() - written) * 1000)
+        return {
+            'tested': len(emails),
+            'duration_ms': int((time.perf_counter() - started) * 1000),
+            'db_write_ms': db_write_ms,
+            'timing_summary': summarize_timings(r['timings'] for r in results),
+            'results': [
+                {
+                    'generated_email_id': r['generated_email_id'],
+                    'passed': r['passed'],
+                    'duration_ms': r['duration_ms'],
+                }
+                for r in results
+            ],
+        }
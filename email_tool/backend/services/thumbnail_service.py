@@ -0,0 +1,105 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Iterable, Optional
+from PIL import Image, features
+
+
+class ThumbnailService:
+    """Produce compact WebP/JPEG derivatives of full-page screenshots.
+
+    For ``<stem>.png`` this writes ``<stem>_w<width>.<ext>`` for every
+    width in ``widths`` plus ``<stem>_fold.<ext>``, an above-the-fold crop
+    suited to list pages. Derivatives of content-addressed screenshots are
+    content-addressed too, so existing files are never regenerated.
+    """
+
+    widths = (160, 320, 640)
+    fold_width = 320
+    # Height of the fold crop relative to the source width (600x800 viewport)
+    fold_ratio = 4 / 3
+    list_variant = 'fold'
+    quality = 80
+
+    def __init__(self, screenshots_dir: Optional[Path] = None, url_prefix: str = '/static/screenshots'):
+        self.screenshots_dir = screenshots_dir or Path(__file__).resolve().parent / 'static' / 'screenshots'
+        self.url_prefix = url_prefix.rstrip('/')
+        self.extension = 'webp' if features.check('webp') else 'jpg'
+
+    def variant_names(self, stem: str) -> dict[str, str]:
+        names = {f"w{width}": f"{stem}_w{width}.{self.extension}" for width in self.widths}
+        names['fold'] = f"{stem}_fold.{self.extension}"
+        return names
+
+    def _save(self, image: Image.Image, target: Path):
+        temp_path = target.with_name(f".{target.name}.tmp")
+        if self.extension == 'webp':
+            image.save(temp_path, 'WEBP', quality=self.quality, method=4)
+        else:
+            image.save(temp_path, 'JPEG', quality=self.quality, optimize=True, progressive=True)
+        os.replace(temp_path, target)
+
+    def _resize(self, image: Image.Image, width: int) -> Image.Image:
+        if image.width <= width:
+            return image
+        height = max(1, round(image.height * width / image.width))
+        return image.resize((width, height), Image.LANCZOS)
+
+    def create_derivatives(self, png_path: Path) -> dict[str, str]:
+        """Write any missing derivatives of ``png_path`` and return variant -> filename."""
+        png_path = Path(png_path)
+        names = self.variant_names(png_path.stem)
+        missing = {variant: name for variant, name in names.items() if not (png_path.parent / name).exists()}
+        if not missing:
+            return names
+
+        with Image.open(png_path) as source:
+            image = source.convert('RGB')
+        for width in self.widths:
+            variant = f"w{width}"
+            if variant in missing:
+                self._save(self._resize(image, width), png_path.parent / missing[variant])
+        if 'fold' in missing:
+            fold_height = min(image.height, round(image.width * self.fold_ratio))
+            fold = image.crop((0, 0, image.width, fold_height))
+            self._save(self._resize(fold, self.fold_width), png_path.parent / missing['fold'])
+        return names
+
+    def existing_variants(self, png_path: Path, listing: Optional[Iterable[str]] = None) -> list[str]:
+        """Return the derivatives of ``png_path`` that exist.
+
+        ``listing`` holds file names already read from the directory, so
+        callers that globbed it need not stat each derivative again.
+        """
+        png_path = Path(png_path)
+        names = self.variant_names(png_path.stem)
+        if listing is not None:
+            listing = set(listing)
+            return sorted(variant for variant, name in names.items() if name in listing)
+        return sorted(variant for variant, name in names.items() if (png_path.parent / name).exists())
+
+    async def create(self, png_path: Path) -> dict[str, str]:
+        """Create derivatives off the event loop; failures only lose the thumbnails."""
+        try:
+            return await asyncio.to_thread(self.create_derivatives, png_path)
+        except Exception as e:
+            print(f"Failed to create thumbnails for {png_path}: {e}")
+            return {}
+
+    def variant_urls(self, screenshot_url: Optional[str], variants: Optional[Iterable[str]] = None) -> dict[str, str]:
+        """Return derivative URLs for a screenshot URL from the naming scheme, without touching the disk.
+
+        ``variants`` limits the result to the derivatives known to exist, as
+        recorded when they were created; by default all are assumed to exist.
+        """
+        if not screenshot_url:
+            return {}
+        names = self.variant_names(Path(screenshot_url).stem)
+        if variants is not None:
+            variants = set(variants)
+            names = {variant: name for variant, name in names.items() if variant in variants}
+        return {variant: f"{self.url_prefix}/{name}" for variant, name in names.items()}
+
+    def list_url(self, screenshot_url: Optional[str], variants: Optional[Iterable[str]] = None) -> Optional[str]:
+        """URL to show on list pages: the fold crop when available, else the original."""
+        return self.variant_urls(screenshot_url, variants).get(self.list_variant, screenshot_url)
@@ -0,0 +1,208 @@
+import asyncio
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+from PIL import Image, ImageChops
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..models import VisualBaseline
+from ..data_access.generated_email_repository import GeneratedEmailRepository
+from ..data_access.visual_baseline_repository import VisualBaselineRepository
+from ..data_access.visual_diff_repository import VisualDiffRepository
+
+
+class VisualRegressionService:
+    """Compare generated email screenshots against approved baselines.
+
+    Each (template, locale) pair has one baseline. Only byte-identical
+    screenshots (the same content-addressed file) skip the pixel diff;
+    everything else gets a per-pixel diff producing a changed-pixel score
+    and a diff mask image. The 64-bit difference hash is reported as a
+    hint only, since it is too coarse to see small text edits.
+    """
+
+    # Channel difference below which a pixel counts as unchanged (anti-aliasing noise)
+    pixel_tolerance = 16
+
+    def __init__(self, screenshots_dir: Optional[Path] = None, url_prefix: str = '/static/screenshots'):
+        self.screenshots_dir = screenshots_dir or Path(__file__).resolve().parent / 'static' / 'screenshots'
+        self.url_prefix = url_prefix.rstrip('/')
+        self.phash_cache_size = int(os.getenv('VISUAL_PHASH_CACHE_SIZE', '1024'))
+        self.concurrency = int(os.getenv('VISUAL_DIFF_CONCURRENCY', str(os.cpu_count() or 4)))
+        self.generated_email_repository = GeneratedEmailRepository()
+        self.visual_baseline_repository = VisualBaselineRepository()
+        self.visual_diff_repository = VisualDiffRepository()
+        # Screenshots are content-addressed, so a hash per file name never goes stale
+        self._phash_cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def _path(self, url: str) -> Path:
+        return self.screenshots_dir / Path(url).name
+
+    @staticmethod
+    def difference_hash(image: Image.Image) -> str:
+        """64-bit dHash: compare neighbouring pixels of a 9x8 grayscale thumbnail."""
+        small = image.convert('L').resize((9, 8), Image.BILINEAR)
+        pixels = small.tobytes()
+        bits = 0
+        for row in range(8):
+            for col in range(8):
+                left = pixels[row * 9 + col]
+                right = pixels[row * 9 + col + 1]
+                bits = (bits << 1) | (1 if left > right else 0)
+        return f"{bits:016x}"
+
+    def phash(self, url: str) -> str:
+        name = Path(url).name
+        phash = self._phash_cache.get(name)
+        if phash is None:
+            with Image.open(self._path(url)) as image:
+                phash = self.difference_hash(image)
+            self._phash_cache[name] = phash
+            while len(self._phash_cache) > self.phash_cache_size:
+                self._phash_cache.popitem(last=False)
+        else:
+            self._phash_cache.move_to_end(name)
+        return phash
+
+    @staticmethod
+    def hash_distance(first: str, second: str) -> int:
+        return bin(int(first, 16) ^ int(second, 16)).count('1')
+
+    def _pixel_diff(self, baseline_url: str, current_url: str) -> tuple[float, Optional[str]]:
+        """Return the changed-pixel fraction and the URL of the diff mask image."""
+        with Image.open(self._path(baseline_url)) as baseline_image, Image.open(self._path(current_url)) as current_image:
+            baseline = baseline_image.convert('RGB')
+            current = current_image.convert('RGB')
+
+        # Pad both images to the same canvas so height changes count as differences
+        size = (max(baseline.width, current.width), max(baseline.height, current.height))
+        if baseline.size != size:
+            padded = Image.new('RGB', size, 'white')
+            padded.paste(baseline, (0, 0))
+            baseline = padded
+        if current.size != size:
+            padded = Image.new('RGB', size, 'white')
+            padded.paste(current, (0, 0))
+            current = padded
+
+        # Threshold the largest per-channel change, so colour-only edits count too
+        red, green, blue = ImageChops.difference(baseline, current).split()
+        difference = ImageChops.lighter(ImageChops.lighter(red, green), blue)
+        mask = difference.point(lambda value: 255 if value > self.pixel_tolerance else 0)
+        changed = mask.histogram()[255]
+        if changed == 0:
+            return 0.0, None
+
+        # Highlight changed pixels in red over a faded copy of the new render
+        faded = Image.blend(current, Image.new('RGB', size, 'white'), 0.7)
+        overlay = Image.composite(Image.new('RGB', size, (255, 0, 0)), faded, mask)
+        diff_name = f"diff_{Path(baseline_url).stem[:16]}_{Path(current_url).stem[:16]}.png"
+        overlay.save(self.screenshots_dir / diff_name)
+        return changed / (size[0] * size[1]), f"{self.url_prefix}/{diff_name}"
+
+    def compare(self, baseline_url: str, baseline_phash: str, current_url: str) -> dict:
+        """Compare one screenshot with its baseline."""
+        if Path(baseline_url).name == Path(current_url).name:
+            # Content-addressed screenshots: same file means an identical render
+            return {'score': 0.0, 'phash_distance': 0, 'diff_url': None, 'pixel_diff': False}
+        # A matching hash does not rule out small changes such as an edited price
+        distance = self.hash_distance(baseline_phash, self.phash(current_url))
+        score, diff_url = self._pixel_diff(baseline_url, current_url)
+        return {'score': score, 'phash_distance': distance, 'diff_url': diff_url, 'pixel_diff': True}
+
+    async def set_baselines(self, db: AsyncSession, project_id: int) -> int:
+        """Approve the latest screenshot of every (template, locale) pair as its baseline."""
+        emails = await self.generated_email_repository.get_latest_thumbnails(db, project_id)
+        emails = [email for email in emails if email.template_id is not None]
+        existing = {
+            (baseline.template_id, baseline.locale): baseline
+            for baseline in await self.visual_baseline_repository.get_by_templates(
+                db, list({email.template_id for email in emails})
+            )
+        }
+        hashes = await asyncio.gather(
+            *(asyncio.to_thread(self.phash, email.thumbnail_url) for email in emails),
+            return_exceptions=True,
+        )
+        baselines = []
+        for email, phash in zip(emails, hashes):
+            if isinstance(phash, Exception):
+                print(f"Could not hash screenshot of email {email.id}: {phash}")
+                continue
+            baseline = existing.get((email.template_id, email.language))
+            if baseline is None:
+                baseline = VisualBaseline(template_id=email.template_id, locale=email.language)
+            baseline.screenshot_url = email.thumbnail_url
+            baseline.phash = phash
+            baselines.append(baseline)
+        await self.visual_baseline_repository.save_many(db, baselines)
+        return len(baselines)
+
+    async def compare_project(
+        self, db: AsyncSession, project_id: int, threshold: float = 0.001, email_ids: list[int] | None = None
+    ) -> dict:
+        """Diff the latest screenshots of a project against their baselines and store the results.
+
+        ``email_ids`` limits the comparison to those emails, so a generation
+        run only diffs what it produced.
+        """
+        emails = await self.generated_email_repository.get_latest_thumbnails(db, project_id, email_ids)
+        baselines = {
+            (baseline.template_id, baseline.locale): baseline
+            for baseline in await self.visual_baseline_repository.get_by_templates(
+                db, list({email.template_id for email in emails if email.template_id is not None})
+            )
+        }
+        pairs = [
+            (email, baselines[(email.template_id, email.language)])
+            for email in emails
+            if (email.template_id, email.language) in baselines
+        ]
+
+        # Pillow releases the GIL for the heavy image operations, so threads scale
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def compare_one(email, baseline):
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(
+                        self.compare, baseline.screenshot_url, baseline.phash, email.thumbnail_url
+                    )
+                except Exception as e:
+                    print(f"Visual diff failed for email {email.id}: {e}")
+                    return None
+
+        comparisons = await asyncio.gather(*(compare_one(email, baseline) for email, baseline in pairs))
+
+        rows = []
+        results = []
+        for (email, baseline), comparison in zip(pairs, comparisons):
+            if comparison is None:
+                continue
+            passed = comparison['score'] <= threshold
+            rows.append({
+                'generated_email_id': email.id,
+                'baseline_id': baseline.id,
+                'score': comparison['score'],
+                'phash_distance': comparison['phash_distance'],
+                'diff_url': comparison['diff_url'],
+                'passed': passed,
+            })
+            results.append({
+                'generated_email_id': email.id,
+                'template_id': email.template_id,
+                'locale': email.language,
+                'baseline_url': baseline.screenshot_url,
+                'screenshot_url': email.thumbnail_url,
+                'passed': passed,
+                **comparison,
+            })
+        await self.visual_diff_repository.bulk_create(db, rows)
+
+        return {
+            'compared': len(results),
+            'changed': sum(1 for r in results if not r['passed']),
+            'without_baseline': len(emails) - len(pairs),
+            'pixel_diffs': sum(1 for r in results if r['pixel_diff']),
+            'results': results,
+        }
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the segment fast path against Jinja for plain {{key}} templates.
+Run this script from the repository root or the email_tool directory:
+
+    python email_tool/benchmark_render.py [--renders 2000] [template.html ...]
+
+Each template is rendered with synthetic copy for every placeholder; both
+paths must produce the same HTML.
+"""
+
+import argparse
+import sys
+import os
+import time
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from email_tool.backend.services.placeholder_template import PLACEHOLDER_PATTERN, compile_segments, render_segments
+from email_tool.backend.services.template_cache import TemplateCache
+
+
+def timed(render, copies) -> float:
+    started = time.perf_counter()
+    for copy in copies:
+        render(copy)
+    return (time.perf_counter() - started) * 1000
+
+
+def benchmark(path: Path, renders: int):
+    source = path.read_text(encoding='utf-8')
+    segments = compile_segments(source)
+    if segments is None:
+        print(f"{path.name}: uses Jinja syntax beyond {{{{key}}}}, rendered by Jinja only")
+        return
+
+    keys = sorted(set(PLACEHOLDER_PATTERN.findall(source)))
+    copies = [{key: f"{key} #{i}" for key in keys} for i in range(renders)]
+
+    started = time.perf_counter()
+    template = TemplateCache().get(source)
+    compile_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    compile_segments(source)
+    segments_ms = (time.perf_counter() - started) * 1000
+
+    hyphenated = [key for key in keys if '-' in key]
+    if hyphenated:
+        # Jinja reads first-name as first - name, so only the fast path can render these
+        jinja_ms = None
+    else:
+        assert all(template.render(**copy) == render_segments(segments, copy) for copy in copies[:10])
+        jinja_ms = timed(lambda copy: template.render(**copy), copies)
+    fast_ms = timed(lambda copy: render_segments(segments, copy), copies)
+
+    print(f"{path.name}: {len(source) / 1024:.0f} KB, {len(keys)} keys, {renders} renders")
+    print(f"  compile  jinja {compile_ms:8.1f} ms   segments {segments_ms:8.1f} ms")
+    if jinja_ms is None:
+        print(f"  render   jinja      n/a (hyphenated keys: {', '.join(hyphenated)})")
+        print(f"           segments {fast_ms:8.1f} ms")
+    else:
+        print(f"  render   jinja {jinja_ms:8.1f} ms   segments {fast_ms:8.1f} ms   ({jinja_ms / fast_ms:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('templates', nargs='*', type=Path,
+                        help='Templates to benchmark (default: the sample emails in email_tool/docs)')
+    parser.add_argument('--renders', type=int, default=2000, help='Renders per template and path')
+    args = parser.parse_args()
+
+    templates = args.templates or sorted((Path(__file__).resolve().parent / 'docs').glob('*.html'))
+    for path in templates:
+        benchmark(path, args.renders)
+
+
+if __name__ == "__main__":
+    main()
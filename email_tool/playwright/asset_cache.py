@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import uuid
+from functools import partial
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+ASSET_CACHE_MODES = ('off', 'cache', 'replay')
+
+# Resource types served from the on-disk cache
+CACHEABLE_RESOURCE_TYPES = {'image', 'font', 'stylesheet', 'media'}
+
+# Open-tracking pixels and analytics beacons commonly embedded in emails
+TRACKING_PATTERN = re.compile(
+    r"(google-analytics\.com|googletagmanager\.com|doubleclick\.net|facebook\.com/tr"
+    r"|/track/open|/wf/open|/trk\?|/pixel(\.gif|\.png)?(\?|$)|/beacon|/open\.(gif|png)|/o\.gif)",
+    re.IGNORECASE,
+)
+
+
+class AssetCache:
+    """On-disk cache of remote assets with a TTL, a size cap and LRU eviction.
+
+    Each asset is stored as ``<sha256(url)>.bin`` with a small JSON sidecar
+    holding its content type and expiry. Entries live for the response's
+    ``Cache-Control: max-age`` or ``default_ttl`` seconds, and responses
+    marked ``no-store``/``no-cache`` are not stored. The directory itself is
+    the index, so every worker process sharing it enforces one size cap;
+    recency is kept in file mtimes. Methods do blocking file I/O, so async
+    callers should run them in a thread.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, default_ttl: float = 86400):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def ttl(self, cache_control: Optional[str]) -> float:
+        """Seconds a response may be reused, from its Cache-Control header."""
+        directives = [part.strip().lower() for part in (cache_control or '').split(',') if part.strip()]
+        if 'no-store' in directives or 'no-cache' in directives:
+            return 0
+        for directive in directives:
+            name, _, value = directive.partition('=')
+            if name == 'max-age':
+                try:
+                    return max(0, int(value))
+                except ValueError:
+                    break
+        return self.default_ttl
+
+    def get(self, url: str, allow_stale: bool = False) -> Optional[Tuple[bytes, str]]:
+        """Return (body, content_type) for a fresh cached URL, or None on a miss."""
+        key = self.key(url)
+        try:
+            meta = json.loads(self._meta_path(key).read_text())
+            if not allow_stale and meta.get('expires_at', 0) < time.time():
+                self._remove(key)
+                return None
+            body = self._body_path(key).read_bytes()
+            os.utime(self._body_path(key))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._remove(key)
+            return None
+        return body, meta.get('content_type') or 'application/octet-stream'
+
+    def put(self, url: str, body: bytes, content_type: Optional[str], cache_control: Optional[str] = None):
+        ttl = self.ttl(cache_control)
+        if ttl <= 0 or len(body) > self.max_bytes:
+            return
+        key = self.key(url)
+        fetched_at = time.time()
+        meta = {'url': url, 'content_type': content_type, 'fetched_at': fetched_at, 'expires_at': fetched_at + ttl}
+        # Write both files atomically so other processes never read partial entries
+        self._write(self._body_path(key), body)
+        self._write(self._meta_path(key), json.dumps(meta).encode('utf-8'))
+        self._evict()
+
+    def _write(self, path: Path, data: bytes):
+        temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+    def _scan(self) -> list:
+        """(mtime, size, key) of every stored body, oldest first."""
+        entries = []
+        for file in self.directory.glob('*.bin'):
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                # Evicted by another process meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file.stem))
+        entries.sort()
+        return entries
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._scan())
+
+    def _evict(self):
+        entries = self._scan()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def _remove(self, key: str):
+        for path in (self._body_path(key), self._meta_path(key)):
+            path.unlink(missing_ok=True)
+
+
+def is_tracking_url(url: str) -> bool:
+    return bool(TRACKING_PATTERN.search(url))
+
+
+class AssetInterceptor:
+    """Playwright route handler that serves email assets from an AssetCache.
+
+    In ``cache`` mode misses and expired entries are fetched and stored; in
+    ``replay`` mode only cached assets are served, stale or not, and every
+    other network request is aborted, which makes renders deterministic and
+    fully offline. Contexts installed with ``refresh`` skip cache lookups
+    and store what they fetch, for renders that must see current assets.
+    """
+
+    def __init__(
+        self,
+        cache: AssetCache,
+        mode: str = 'cache',
+        block_tracking: bool = True,
+        block_third_party_scripts: bool = False,
+    ):
+        if mode not in ASSET_CACHE_MODES:
+            raise ValueError(f"Unknown asset cache mode: {mode}")
+        self.cache = cache
+        self.mode = mode
+        self.block_tracking = block_tracking
+        self.block_third_party_scripts = block_third_party_scripts
+
+    async def install(self, context, refresh: bool = False):
+        if self.mode != 'off':
+            await context.route('**/*', partial(self.handle, refresh=refresh) if refresh else self.handle)
+
+    def _is_third_party(self, request) -> bool:
+        try:
+            page_host = urlsplit(request.frame.url).hostname
+        except Exception:
+            page_host = None
+        return urlsplit(request.url).hostname != page_host
+
+    async def handle(self, route, refresh: bool = False):
+        request = route.request
+        url = request.url
+        if not url.startswith(('http://', 'https://')):
+            return await route.continue_()
+
+        if self.block_tracking and is_tracking_url(url):
+            return await route.abort()
+        if (
+            self.block_third_party_scripts
+            and request.resource_type == 'script'
+            and self._is_third_party(request)
+        ):
+            return await route.abort()
+
+        if request.method == 'GET' and request.resource_type in CACHEABLE_RESOURCE_TYPES:
+            replay = self.mode == 'replay'
+            cached = None
+            if replay or not refresh:
+                cached = await asyncio.to_thread(self.cache.get, url, replay)
+            if cached is not None:
+                body, content_type = cached
+                return await route.fulfill(status=200, body=body, headers={'content-type': content_type})
+            if self.mode == 'replay':
+                return await route.abort()
+            try:
+                response = await route.fetch()
+                body = await response.body()
+            except Exception as e:
+                print(f"Asset fetch failed for {url}: {e}", file=sys.stderr)
+                return await route.abort()
+            if response.ok:
+                await asyncio.to_thread(
+                    self.cache.put, url, body,
+                    response.headers.get('content-type'), response.headers.get('cache-control'),
+                )
+            return await route.fulfill(response=response, body=body)
+
+        if self.mode == 'replay':
+            return await route.abort()
+        return await route.continue_()
+
+
+def interceptor_from_env() -> Optional[AssetInterceptor]:
+    """Build the shared interceptor from ASSET_CACHE_* settings, or None when disabled."""
+    mode = os.getenv('ASSET_CACHE_MODE', 'cache')
+    if mode == 'off':
+        return None
+    directory = os.getenv(
+        'ASSET_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'email_tool_assets')
+    )
+    max_bytes = int(os.getenv('ASSET_CACHE_MAX_MB', '256')) * 1024 * 1024
+    default_ttl = float(os.getenv('ASSET_CACHE_TTL', '86400'))
+    return AssetInterceptor(
+        AssetCache(Path(directory), max_bytes, default_ttl),
+        mode=mode,
+        block_tracking=os.getenv('ASSET_BLOCK_TRACKING', 'true').lower() == 'true',
+        block_third_party_scripts=os.getenv('ASSET_BLOCK_THIRD_PARTY_SCRIPTS', 'false').lower() == 'true',
+    )
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from playwright.async_api import async_playwright
+
+try:
+    from .asset_cache import AssetInterceptor, interceptor_from_env
+    from .phase_timer import PhaseTimer, optional_phase
+except ImportError:
+    # Allow importing this module from scripts run inside this directory
+    from asset_cache import AssetInterceptor, interceptor_from_env
+    from phase_timer import PhaseTimer, optional_phase
+
+# Launch arguments that keep Chromium working inside Docker
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-accelerated-2d-canvas',
+    '--no-first-run',
+    '--no-zygote',
+    '--disable-gpu'
+]
+
+
+class _PooledBrowser:
+    """A launched browser plus the bookkeeping needed to recycle it."""
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages_served = 0
+        self.active = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """Keep a few long-lived Chromium instances and hand out isolated pages.
+
+    Every page lives in its own browser context, so cookies, storage and
+    routes never leak between emails. A browser is retired after serving
+    ``max_pages_per_browser`` pages and closed once its last page is released.
+    When an asset interceptor is configured, every context routes its
+    network requests through the shared offline asset cache.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_pages_per_browser: Optional[int] = None,
+        launch_args: Optional[List[str]] = None,
+        asset_interceptor: Optional[AssetInterceptor] = None,
+    ):
+        self.size = size or int(os.getenv('BROWSER_POOL_SIZE', '2'))
+        self.max_pages_per_browser = max_pages_per_browser or int(
+            os.getenv('BROWSER_POOL_MAX_PAGES', '200')
+        )
+        self.launch_args = launch_args or CHROMIUM_ARGS
+        self.asset_interceptor = asset_interceptor
+        self._playwright = None
+        self._browsers: List[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self):
+        """Start Playwright and launch the browsers (safe to call repeatedly)."""
+        async with self._lock:
+            if self._playwright is not None:
+                return
+            self._playwright = await async_playwright().start()
+            try:
+                for _ in range(self.size):
+                    self._browsers.append(await self._launch())
+            except Exception:
+                await self._shutdown()
+                raise
+
+    async def stop(self):
+        """Close every browser and stop Playwright."""
+        async with self._lock:
+            await self._shutdown()
+
+    async def _shutdown(self):
+        browsers, self._browsers = self._browsers, []
+        for pooled in browsers:
+            await self._close_browser(pooled)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                print(f"Failed to stop Playwright: {e}", file=sys.stderr)
+            self._playwright = None
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self._playwright.chromium.launch(headless=True, args=self.launch_args)
+        return _PooledBrowser(browser)
+
+    async def _close_browser(self, pooled: _PooledBrowser):
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            print(f"Failed to close pooled browser: {e}", file=sys.stderr)
+
+    async def _acquire(self) -> _PooledBrowser:
+        if not self.started:
+            await self.start()
+        async with self._lock:
+            # Replace browsers that crashed or were retired
+            for index, pooled in enumerate(self._browsers):
+                if pooled.retired or not pooled.browser.is_connected():
+                    pooled.retired = True
+                    if pooled.active == 0:
+                        await self._close_browser(pooled)
+                    self._browsers[index] = await self._launch()
+
+            pooled = min(self._browsers, key=lambda b: b.active)
+            pooled.active += 1
+            pooled.pages_served += 1
+            if pooled.pages_served >= self.max_pages_per_browser:
+                pooled.retired = True
+            return pooled
+
+    async def _release(self, pooled: _PooledBrowser):
+        async with self._lock:
+            pooled.active -= 1
+            if pooled.retired and pooled.active == 0 and pooled not in self._browsers:
+                await self._close_browser(pooled)
+
+    @asynccontextmanager
+    async def context(
+        self,
+        intercept_assets: bool = True,
+        timer: Optional[PhaseTimer] = None,
+        refresh_assets: bool = False,
+        **context_options: Any,
+    ):
+        """Yield a fresh browser context that is closed on exit.
+
+        ``refresh_assets`` refetches cached assets instead of serving them.
+
+        With a ``timer``, getting a browser (including any launch) is recorded
+        as the ``launch`` phase and creating the context as ``context``.
+        """
+        with optional_phase(timer, 'launch'):
+            pooled = await self._acquire()
+        context = None
+        try:
+            with optional_phase(timer, 'context'):
+                context = await pooled.browser.new_context(**context_options)
+                if intercept_assets and self.asset_interceptor is not None:
+                    await self.asset_interceptor.install(context, refresh=refresh_assets)
+            yield context
+        finally:
+            if context is not None:
+                try:
+                    await context.close()
+                except Exception as e:
+                    print(f"Failed to close browser context: {e}", file=sys.stderr)
+            await self._release(pooled)
+
+    @asynccontextmanager
+    async def page(
+        self,
+        viewport: Optional[Dict[str, int]] = None,
+        intercept_assets: bool = True,
+        timer: Optional[PhaseTimer] = None,
+        refresh_assets: bool = False,
+        **context_options: Any,
+    ):
+        """Yield a new page in its own isolated browser context."""
+        if viewport is not None:
+            context_options['viewport'] = viewport
+        async with self.context(intercept_assets, timer, refresh_assets, **context_options) as context:
+            with optional_phase(timer, 'context'):
+                page = await context.new_page()
+            yield page
+
+
+# Shared pool for the whole application
+browser_pool = BrowserPool(asset_interceptor=interceptor_from_env())
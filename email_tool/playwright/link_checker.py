@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urldefrag, urlsplit
+import httpx
+
+# Some servers refuse HEAD; these statuses trigger a GET retry
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+# Results worth retrying soon: rate limiting and server errors
+TRANSIENT_STATUSES = {408, 429}
+
+
+class _LinkExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.urls: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != 'a':
+            return
+        href = (dict(attrs).get('href') or '').strip()
+        if href.lower().startswith(('http://', 'https://')):
+            self.urls.append(urldefrag(href)[0])
+
+
+def extract_links(html: str) -> List[str]:
+    """Unique absolute http(s) link targets of an email, in document order."""
+    parser = _LinkExtractor()
+    parser.feed(html)
+    parser.close()
+    return list(dict.fromkeys(parser.urls))
+
+
+class _HostLimiter:
+    """Cap concurrent requests to one host and space out their start times."""
+
+    def __init__(self, concurrency: int, interval: float):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait_turn(self):
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class LinkChecker:
+    """Check link reachability concurrently over one pooled HTTP client.
+
+    Requests go out with at most ``concurrency`` in flight overall and
+    ``per_host`` per host, with request starts to one host spaced by
+    ``host_interval`` seconds. Results are cached per URL for ``cache_ttl``
+    seconds, so repeated checks of the same links skip the network.
+    Transient failures (errors, timeouts, 408/429 and 5xx) are only cached
+    for ``failure_ttl`` seconds, and the cache holds at most ``cache_size``
+    URLs.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        per_host: Optional[int] = None,
+        host_interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        cache_ttl: Optional[float] = None,
+        failure_ttl: Optional[float] = None,
+        cache_size: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.concurrency = concurrency or int(os.getenv('LINK_CHECK_CONCURRENCY', '20'))
+        self.per_host = per_host or int(os.getenv('LINK_CHECK_PER_HOST', '4'))
+        self.host_interval = (
+            host_interval if host_interval is not None
+            else int(os.getenv('LINK_CHECK_HOST_INTERVAL_MS', '100')) / 1000
+        )
+        self.timeout = timeout or float(os.getenv('LINK_CHECK_TIMEOUT', '10'))
+        self.cache_ttl = cache_ttl if cache_ttl is not None else float(os.getenv('LINK_CHECK_CACHE_TTL', '3600'))
+        self.failure_ttl = (
+            failure_ttl if failure_ttl is not None else float(os.getenv('LINK_CHECK_FAILURE_TTL', '60'))
+        )
+        self.cache_size = cache_size or int(os.getenv('LINK_CHECK_CACHE_SIZE', '10000'))
+        self.transport = transport
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def cached(self, url: str) -> Optional[Dict[str, Any]]:
+        entry = self._cache.get(url)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._cache[url]
+            return None
+        return {**result, 'cached': True}
+
+    @staticmethod
+    def is_transient(result: Dict[str, Any]) -> bool:
+        status = result.get('status_code')
+        return status is None or status >= 500 or status in TRANSIENT_STATUSES
+
+    def _store(self, url: str, result: Dict[str, Any]):
+        ttl = self.failure_ttl if self.is_transient(result) else self.cache_ttl
+        if ttl <= 0:
+            self._cache.pop(url, None)
+            return
+        now = time.monotonic()
+        self._cache[url] = (now + ttl, {k: v for k, v in result.items() if k != 'cached'})
+        self._cache.move_to_end(url)
+        if len(self._cache) > self.cache_size:
+            # Prune expired entries first, then the least recently checked URLs
+            for expired in [key for key, (expires_at, _) in self._cache.items() if expires_at < now]:
+                del self._cache[expired]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers={'User-Agent': 'EmailTool-LinkChecker/1.0'},
+            transport=self.transport,
+        )
+
+    async def _request(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
+        response = await client.head(url)
+        if response.status_code in HEAD_FALLBACK_STATUSES:
+            # Only the status matters, so never download the body
+            async with client.stream('GET', url) as streamed:
+                return streamed
+        return response
+
+    async def _check(self, client, limiters: Dict[str, _HostLimiter], semaphore: asyncio.Semaphore, url: str):
+        host = urlsplit(url).hostname or ''
+        limiter = limiters.setdefault(host, _HostLimiter(self.per_host, self.host_interval))
+        result: Dict[str, Any] = {'url': url, 'host': host, 'cached': False}
+        # Take the host slot and wait out its pacing before taking a global
+        # slot, so a busy or paced host never holds global slots idle
+        async with limiter.semaphore:
+            await limiter.wait_turn()
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await self._request(client, url)
+                    result.update(
+                        status_code=response.status_code,
+                        ok=response.status_code < 400,
+                        final_url=str(response.url),
+                        error=None,
+                    )
+                except Exception as e:
+                    result.update(status_code=None, ok=False, final_url=None, error=str(e) or type(e).__name__)
+                result['elapsed_ms'] = int((time.perf_counter() - started) * 1000)
+        self._store(url, result)
+        return result
+
+    async def check_many(self, urls: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Check every unique URL and return url -> result."""
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: List[str] = []
+        seen: Set[str] = set()
+        for url in urls:
+            if url in seen:
+                continue
+            seen.add(url)
+            hit = self.cached(url)
+            if hit is not None:
+                results[url] = hit
+            else:
+                pending.append(url)
+
+        if pending:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            limiters: Dict[str, _HostLimiter] = {}
+            async with self._client() as client:
+                checked = await asyncio.gather(
+                    *(self._check(client, limiters, semaphore, url) for url in pending)
+                )
+            results.update({result['url']: result for result in checked})
+        return results
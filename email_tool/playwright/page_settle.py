@@ -0,0 +1,56 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+SETTLE_MODES = ('auto', 'fixed', 'none')
+DEFAULT_SETTLE_MODE = os.getenv('SETTLE_MODE', 'auto')
+# Upper bound for 'auto' settling, so a stuck request never stalls a render
+SETTLE_TIMEOUT_MS = int(os.getenv('SETTLE_TIMEOUT_MS', '3000'))
+# Sleep used by the legacy 'fixed' mode
+FIXED_SETTLE_MS = 1000
+
+# Resolves once every image is decoded (or failed) and web fonts are ready
+_ASSETS_READY_SCRIPT = """
+async () => {
+    const images = Array.from(document.images).map((img) =>
+        img.complete ? Promise.resolve() : img.decode().catch(() => {})
+    );
+    await Promise.all(images);
+    if (document.fonts && document.fonts.ready) {
+        await document.fonts.ready;
+    }
+}
+"""
+
+
+async def settle_page(page, mode: Optional[str] = None, timeout_ms: Optional[int] = None) -> float:
+    """Wait until the page is visually stable and return how long that took in ms.
+
+    ``auto`` waits for DOM content, decoded images, loaded fonts and network
+    idle, but never longer than ``timeout_ms``. ``fixed`` keeps the old
+    one-second sleep and ``none`` returns immediately.
+    """
+    mode = mode or DEFAULT_SETTLE_MODE
+    if mode not in SETTLE_MODES:
+        raise ValueError(f"Unknown settle mode: {mode}")
+    started = time.perf_counter()
+
+    if mode == 'fixed':
+        await page.wait_for_timeout(FIXED_SETTLE_MS)
+    elif mode == 'auto':
+        timeout_ms = timeout_ms or SETTLE_TIMEOUT_MS
+        deadline = started + timeout_ms / 1000
+
+        def remaining_ms() -> float:
+            return max(0.0, (deadline - time.perf_counter()) * 1000)
+
+        try:
+            await page.wait_for_load_state('domcontentloaded', timeout=remaining_ms() or 1)
+            await asyncio.wait_for(page.evaluate(_ASSETS_READY_SCRIPT), remaining_ms() / 1000)
+            await page.wait_for_load_state('networkidle', timeout=remaining_ms() or 1)
+        except Exception:
+            # Hitting the cap is fine: capture whatever has rendered so far
+            pass
+
+    return (time.perf_counter() - started) * 1000
@@ -0,0 +1,100 @@
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class PhaseTimer:
+    """Collect wall-clock timings for the phases and steps of one run.
+
+    ``to_dict()`` produces the JSON stored on result rows::
+
+        {'total_ms': 812.4,
+         'phases': {'launch': 3.1, 'context': 40.2, 'goto': 95.0, ...},
+         'steps': [{'step': 1, 'action': 'click', 'ms': 12.5}, ...]}
+
+    Repeated phases accumulate. Steps observed together in one browser
+    round-trip share its time and carry ``batched`` with the batch size.
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.steps: List[Dict[str, Any]] = []
+
+    def add(self, name: str, ms: float):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - started) * 1000)
+
+    def add_step(self, step: Any, action: str, ms: float, batched: Optional[int] = None):
+        entry = {'step': step, 'action': action, 'ms': round(ms, 1)}
+        if batched:
+            entry['batched'] = batched
+        self.steps.append(entry)
+
+    @contextmanager
+    def step(self, step: Any, action: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_step(step, action, (time.perf_counter() - started) * 1000)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total_ms': round((time.perf_counter() - self._started) * 1000, 1),
+            'phases': {name: round(ms, 1) for name, ms in self.phases.items()},
+            'steps': list(self.steps),
+        }
+
+
+@contextmanager
+def optional_phase(timer: Optional[PhaseTimer], name: str):
+    """``timer.phase(name)`` when a timer is given, otherwise a no-op."""
+    if timer is None:
+        yield
+    else:
+        with timer.phase(name):
+            yield
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of ``values`` (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize_timings(timings: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Aggregate stored timings into count/p50/p95 per phase and per step action."""
+    phases: Dict[str, List[float]] = {}
+    actions: Dict[str, List[float]] = {}
+    totals: List[float] = []
+    for timing in timings:
+        if not timing:
+            continue
+        if timing.get('total_ms') is not None:
+            totals.append(timing['total_ms'])
+        for name, ms in (timing.get('phases') or {}).items():
+            phases.setdefault(name, []).append(ms)
+        for step in timing.get('steps') or []:
+            actions.setdefault(step['action'], []).append(step['ms'])
+
+    def stats(values: List[float]) -> Dict[str, Any]:
+        return {'count': len(values), 'p50_ms': percentile(values, 50), 'p95_ms': percentile(values, 95)}
+
+    return {
+        'runs': len(totals),
+        'total': stats(totals),
+        'phases': {name: stats(values) for name, values in phases.items()},
+        'actions': {name: stats(values) for name, values in actions.items()},
+    }
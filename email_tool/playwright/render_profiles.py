@@ -0,0 +1,62 @@
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# Named render profiles: a viewport plus the media features to emulate.
+# Profiles only vary what can change on a live page, so a single loaded
+# page can be captured in all of them by resizing and re-emulating.
+RENDER_PROFILES: Dict[str, Dict[str, Any]] = {
+    'desktop': {'viewport': {'width': 600, 'height': 800}, 'color_scheme': 'light'},
+    'mobile': {'viewport': {'width': 375, 'height': 667}, 'color_scheme': 'light'},
+    'dark': {'viewport': {'width': 600, 'height': 800}, 'color_scheme': 'dark'},
+}
+
+# Profiles captured for generated emails unless a request asks for others
+DEFAULT_PROFILES = [
+    name.strip() for name in os.getenv('RENDER_PROFILES', 'desktop').split(',') if name.strip()
+]
+
+
+def resolve_profiles(names: Optional[List[str]] = None) -> List[str]:
+    """Validate profile names, keeping their order and dropping duplicates."""
+    resolved = []
+    for name in names or DEFAULT_PROFILES:
+        if name not in RENDER_PROFILES:
+            raise ValueError(f"Unknown render profile: {name}")
+        if name not in resolved:
+            resolved.append(name)
+    return resolved
+
+
+def profile_cache_options(name: str) -> Dict[str, Any]:
+    """Screenshot cache options for a profile.
+
+    Light-mode profiles add no options, so their keys match the keys of
+    screenshots captured before profiles existed.
+    """
+    options: Dict[str, Any] = {'full_page': True}
+    color_scheme = RENDER_PROFILES[name]['color_scheme']
+    if color_scheme != 'light':
+        options['color_scheme'] = color_scheme
+    return options
+
+
+async def capture_profiles(page, html: str, captures: List[Tuple[str, str]]) -> Dict[str, bool]:
+    """Load ``html`` once and screenshot it in every (profile, out_path) pair.
+
+    Returns a success flag per profile. The page keeps the last profile's
+    viewport and color scheme, so callers reusing it must not rely on them.
+    """
+    await page.set_content(html)
+    results: Dict[str, bool] = {}
+    for name, out_path in captures:
+        profile = RENDER_PROFILES[name]
+        try:
+            await page.set_viewport_size(profile['viewport'])
+            await page.emulate_media(color_scheme=profile['color_scheme'])
+            await page.screenshot(path=out_path, full_page=True)
+            results[name] = True
+        except Exception as e:
+            print(f"Screenshot failed for profile {name}: {str(e)}", file=sys.stderr)
+            results[name] = False
+    return results
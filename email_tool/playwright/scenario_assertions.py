@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional
+
+# Assertions that only read page state and can be observed in one batch
+READ_ONLY_ACTIONS = {'expectText', 'expectAttr', 'expectPageTitle', 'expectUrlContains'}
+
+# Runs inside the page and returns every observed value in one round-trip
+OBSERVE_SCRIPT = """
+(probes) => probes.map((probe) => {
+    if (probe.kind === 'title') {
+        return { found: true, value: document.title };
+    }
+    if (probe.kind === 'url') {
+        return { found: true, value: window.location.href };
+    }
+    const element = document.querySelector(probe.selector);
+    if (!element) {
+        return { found: false, value: null };
+    }
+    if (probe.kind === 'text') {
+        return { found: true, value: element.textContent };
+    }
+    return { found: true, value: element.getAttribute(probe.attr) };
+})
+"""
+
+_PROBE_KINDS = {
+    'expectText': 'text',
+    'expectAttr': 'attr',
+    'expectPageTitle': 'title',
+    'expectUrlContains': 'url',
+}
+
+
+def testid_selector(selector: Optional[str]) -> str:
+    return f'[data-testid="{selector}"]'
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapse every run of whitespace so markup formatting never matters."""
+    return ' '.join((text or '').split())
+
+
+def build_probes(steps) -> List[Dict[str, Any]]:
+    """Compile read-only steps into the payload expected by OBSERVE_SCRIPT."""
+    return [
+        {
+            'kind': _PROBE_KINDS[getattr(step, 'action')],
+            'selector': testid_selector(getattr(step, 'selector')),
+            'attr': getattr(step, 'attr'),
+        }
+        for step in steps
+    ]
+
+
+async def wait_for_probes(page, probes: List[Dict[str, Any]]):
+    """Wait until every element probed by ``probes`` is attached.
+
+    Needed once the page has been interacted with, since clicks and fills
+    may change the DOM asynchronously. Elements that never appear are left
+    to OBSERVE_SCRIPT, which reports them as not found.
+    """
+    for probe in probes:
+        if probe['kind'] in ('text', 'attr'):
+            try:
+                await page.wait_for_selector(probe['selector'], state='attached')
+            except Exception:
+                pass
+
+
+def check_observation(step, observation: Dict[str, Any], logs: List[str]):
+    """Compare an observed value with the step expectation, raising on mismatch."""
+    action = getattr(step, 'action')
+    selector = getattr(step, 'selector')
+    value = getattr(step, 'value')
+    attr = getattr(step, 'attr')
+
+    if not observation.get('found'):
+        raise Exception(f"Element '{selector}' not found")
+    observed = observation.get('value')
+
+    if action == 'expectText':
+        logs.append(f"Found text: '{observed}'")
+        logs.append(f"Expected text: '{value}'")
+        text_content_normalized = normalize_text(observed)
+        value_normalized = normalize_text(value)
+        if value_normalized and value_normalized != text_content_normalized:
+            raise Exception(f"Expected text '{value_normalized}' does not match '{text_content_normalized}' in element '{selector}'")
+    elif action == 'expectAttr':
+        logs.append(f"Found attribute {attr}: '{observed}'")
+        logs.append(f"Expected attribute {attr}: '{value}'")
+        if observed != value:
+            raise Exception(f"Expected attribute '{attr}' to be '{value}', got '{observed}'")
+    elif action == 'expectUrlContains':
+        logs.append(f"Current URL: '{observed}'")
+        logs.append(f"Expected URL to contain: '{value}'")
+        if value and value not in (observed or ''):
+            raise Exception(f"Expected URL to contain '{value}', got '{observed}'")
+    elif action == 'expectPageTitle':
+        logs.append(f"Current page title: '{observed}'")
+        logs.append(f"Expected page title: '{value}'")
+        if value and value != observed:
+            raise Exception(f"Expected page title '{value}', got '{observed}'")
+    else:
+        raise Exception(f"Unknown action: {action}")
+
+
+def read_only_run(steps, start: int) -> list:
+    """Return the consecutive read-only steps beginning at ``start``."""
+    run = []
+    for step in steps[start:]:
+        if getattr(step, 'action') not in READ_ONLY_ACTIONS:
+            break
+        run.append(step)
+    return run
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class ScreenshotCache:
+    """Content-addressed store for screenshots.
+
+    A screenshot is stored as ``<sha256>.png`` where the hash covers the
+    HTML, the viewport and any render options, so identical renders are
+    captured once and every later lookup skips the browser entirely.
+    """
+
+    def __init__(self, directory: Path, url_prefix: str = '/static/screenshots'):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.url_prefix = url_prefix.rstrip('/')
+
+    @staticmethod
+    def key(html: str, viewport: Optional[Dict[str, int]] = None, **options: Any) -> str:
+        header = json.dumps({'viewport': viewport, 'options': options}, sort_keys=True)
+        digest = hashlib.sha256(header.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(html.encode('utf-8'))
+        return digest.hexdigest()
+
+    def filename(self, key: str) -> str:
+        return f"{key}.png"
+
+    def path(self, key: str) -> Path:
+        return self.directory / self.filename(key)
+
+    def url(self, key: str) -> str:
+        return f"{self.url_prefix}/{self.filename(key)}"
+
+    def lookup(self, key: str) -> Optional[Path]:
+        """Return the stored screenshot for ``key`` or None on a miss."""
+        path = self.path(key)
+        try:
+            if path.stat().st_size > 0:
+                return path
+        except FileNotFoundError:
+            pass
+        return None
+
+    def temp_path(self, key: str) -> Path:
+        """Path to capture into before the file is published under its key."""
+        return self.directory / f".{key}.{uuid.uuid4().hex}.tmp.png"
+
+    def publish(self, temp_path: Path, key: str) -> Path:
+        """Atomically move a finished capture into place."""
+        path = self.path(key)
+        os.replace(temp_path, path)
+        return path
@@ -0,0 +1,122 @@
+import asyncio
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional
+
+PLACEHOLDER_PATTERN = re.compile(r"{{\s*[\w-]+\s*}}")
+
+# Emails below this count are validated inline; larger batches use worker processes
+PROCESS_THRESHOLD = int(os.getenv('STATIC_CHECK_PROCESS_THRESHOLD', '500'))
+WORKERS = int(os.getenv('STATIC_CHECK_WORKERS', str(os.cpu_count() or 1)))
+
+# Started on the first large batch and kept until the app shuts down
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+class _EmailScanner(HTMLParser):
+    """Single pass over the markup collecting everything the checks need."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.issues: List[str] = []
+        self.testids: Dict[str, int] = {}
+
+    def handle_starttag(self, tag, attrs):
+        attributes = dict(attrs)
+        if tag == 'a':
+            if 'href' not in attributes:
+                self.issues.append('missing href')
+            else:
+                href = (attributes['href'] or '').strip()
+                if not href:
+                    self.issues.append('empty href')
+                elif href.lower().startswith('javascript:'):
+                    self.issues.append(f'javascript: href ({href[:50]})')
+        elif tag == 'img' and 'alt' not in attributes:
+            self.issues.append(f"missing alt ({attributes.get('src') or 'no src'})")
+
+        testid = attributes.get('data-testid')
+        if testid is not None:
+            self.testids[testid] = self.testids.get(testid, 0) + 1
+
+    handle_startendtag = handle_starttag
+
+
+def validate_html(html: str) -> Dict[str, Any]:
+    """Run every static check against ``html`` without a browser."""
+    started = time.perf_counter()
+    issues = []
+    if PLACEHOLDER_PATTERN.search(html):
+        issues.append('Unreplaced placeholders')
+
+    scanner = _EmailScanner()
+    try:
+        scanner.feed(html)
+        scanner.close()
+    except Exception as e:
+        issues.append(f'HTML parsing failed: {str(e)}')
+    issues.extend(scanner.issues)
+    for testid, count in scanner.testids.items():
+        if count > 1:
+            issues.append(f'duplicate data-testid "{testid}" ({count} elements)')
+
+    return {
+        'passed': len(issues) == 0,
+        'issues': issues,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def _validate_chunk(htmls: List[str]) -> List[Dict[str, Any]]:
+    return [validate_html(html) for html in htmls]
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # Spawned workers start clean instead of inheriting the API's event loop
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    return _executor
+
+
+async def stop():
+    """Shut down the worker processes, if any were started."""
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+
+async def validate_many(htmls: List[str], max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Validate a batch of emails, spreading large batches over worker processes.
+
+    The workers are shared between batches; ``max_workers`` sizes the pool
+    when the first large batch starts it.
+    """
+    global _executor
+    if len(htmls) < PROCESS_THRESHOLD:
+        return _validate_chunk(htmls)
+
+    workers = max_workers or WORKERS
+    executor = _get_executor(workers)
+    chunk_size = max(1, -(-len(htmls) // workers))
+    chunks = [htmls[i:i + chunk_size] for i in range(0, len(htmls), chunk_size)]
+    loop = asyncio.get_running_loop()
+    try:
+        results = await asyncio.gather(
+            *(loop.run_in_executor(executor, _validate_chunk, chunk) for chunk in chunks)
+        )
+    except BrokenProcessPool:
+        # Replace the pool for later batches and finish this one inline
+        print("Static check worker crashed; restarting the pool", file=sys.stderr)
+        if _executor is executor:
+            _executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+        return _validate_chunk(htmls)
+    return [result for chunk_results in results for result in chunk_results]
@@ -0,0 +1,66 @@
+import hashlib
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from bs4 import BeautifulSoup
+
+try:
+    from .scenario_assertions import READ_ONLY_ACTIONS
+except ImportError:
+    # Allow importing this module from scripts run inside this directory
+    from scenario_assertions import READ_ONLY_ACTIONS
+
+# Steps that can be answered from the markup alone; waiting for the load
+# event is a no-op on a document that is never loaded
+STATIC_ACTIONS = READ_ONLY_ACTIONS | {'waitForPageLoad'}
+
+
+def scenario_needs_browser(steps, html: str) -> bool:
+    """True when a scenario interacts with the page or its DOM may change at runtime."""
+    if any(getattr(step, 'action') not in STATIC_ACTIONS for step in steps):
+        return True
+    # Scripts could rewrite the DOM after load, which only a browser sees
+    return '<script' in html.lower()
+
+
+class StaticDomCache:
+    """Parsed documents keyed by the hash of their HTML, with LRU eviction."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or int(os.getenv('STATIC_DOM_CACHE_SIZE', '128'))
+        self._documents: "OrderedDict[str, BeautifulSoup]" = OrderedDict()
+
+    def get(self, html: str) -> BeautifulSoup:
+        key = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        document = self._documents.get(key)
+        if document is None:
+            # Parse like a browser (implied end tags and all) and keep attribute
+            # values as plain strings, like getAttribute() returns
+            document = BeautifulSoup(html, 'html5lib', multi_valued_attributes=None)
+            self._documents[key] = document
+            while len(self._documents) > self.max_entries:
+                self._documents.popitem(last=False)
+        else:
+            self._documents.move_to_end(key)
+        return document
+
+
+def observe(document: BeautifulSoup, step, url: str) -> Dict[str, Any]:
+    """Return the same {found, value} observation OBSERVE_SCRIPT produces in a browser."""
+    action = getattr(step, 'action')
+    if action == 'expectPageTitle':
+        # document.title strips and collapses whitespace
+        title = document.find('title')
+        return {'found': True, 'value': ' '.join(title.get_text().split()) if title else ''}
+    if action == 'expectUrlContains':
+        return {'found': True, 'value': url}
+    element = document.find(attrs={'data-testid': getattr(step, 'selector')})
+    if element is None:
+        return {'found': False, 'value': None}
+    if action == 'expectText':
+        return {'found': True, 'value': element.get_text()}
+    return {'found': True, 'value': element.get(getattr(step, 'attr'))}
+
+
+# Shared cache of parsed scenario documents
+static_dom_cache = StaticDomCache()
@@ -1,65 +1,133 @@
 import asyncio
-import re
-from playwright.async_api import async_playwright
+import time
 import sys, json, os
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+
+try:
+    from .browser_pool import browser_pool
+    from .static_checks import validate_html
+    from .render_profiles import RENDER_PROFILES, capture_profiles
+    from .phase_timer import PhaseTimer
+except ImportError:
+    # Allow running this file directly as a script
+    from browser_pool import browser_pool
+    from static_checks import validate_html
+    from render_profiles import RENDER_PROFILES, capture_profiles
+    from phase_timer import PhaseTimer
+
+STEP_TIMEOUT_MS = 5000
+
+def needs_browser(test_steps: Optional[List[Dict[str, Any]]] = None) -> bool:
+    """Static checks cover the defaults; only interactive steps need Chromium."""
+    return bool(test_steps)
+
+async def _run_steps(page, test_steps: List[Dict[str, Any]], issues: List[str], timer: PhaseTimer):
+    for index, step in enumerate(test_steps, start=1):
+        step_type = step.get('type')
+        selector = step.get('selector')
+        text = step.get('text')
+        started = time.perf_counter()
+        try:
+            if step_type == 'click':
+                await page.click(selector, timeout=STEP_TIMEOUT_MS)
+            elif step_type == 'fill':
+                await page.fill(selector, text or '', timeout=STEP_TIMEOUT_MS)
+            elif step_type == 'waitForSelector':
+                await page.wait_for_selector(selector, timeout=STEP_TIMEOUT_MS)
+            elif step_type == 'expectText':
+                content = await page.text_content(selector, timeout=STEP_TIMEOUT_MS)
+                if text and text not in (content or ''):
+                    issues.append(f"expected text '{text}' in {selector}")
+            elif step_type == 'expectVisible':
+                if not await page.is_visible(selector):
+                    issues.append(f'{selector} is not visible')
+            else:
+                issues.append(f'unknown step type {step_type}')
+        except Exception as e:
+            issues.append(f'step {step_type} on {selector} failed: {str(e)}')
+        timer.add_step(index, step_type, (time.perf_counter() - started) * 1000)
 
 async def run(html: str, test_steps: Optional[List[Dict[str, Any]]] = None):
-    issues = []
-    if re.search(r"{{\s*\w+\s*}}", html):
-        issues.append('Unreplaced placeholders')
-    try:
-        async with async_playwright() as p:
-            # Launch browser with proper Docker configuration
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-accelerated-2d-canvas',
-                    '--no-first-run',
-                    '--no-zygote',
-                    '--disable-gpu'
-                ]
-            )
-            page = await browser.new_page()
-            await page.set_content(html)
-            links = await page.query_selector_all('a')
-            for link in links:
-                url = await link.get_attribute('href')
-                if not url:
-                    issues.append('missing href')
-            await browser.close()
-    except Exception as e:
-        issues.append(f'Browser automation failed: {str(e)}')
-    return {'passed': len(issues) == 0, 'issues': issues}
+    timer = PhaseTimer()
+    with timer.phase('static_checks'):
+        issues = validate_html(html)['issues']
+    if needs_browser(test_steps):
+        try:
+            async with browser_pool.page(timer=timer) as page:
+                with timer.phase('set_content'):
+                    await page.set_content(html)
+                await _run_steps(page, test_steps, issues, timer)
+        except Exception as e:
+            issues.append(f'Browser automation failed: {str(e)}')
+    return {'passed': len(issues) == 0, 'issues': issues, 'timings': timer.to_dict()}
+
+async def run_many(
+    jobs: List[Tuple[str, Optional[List[Dict[str, Any]]]]], concurrency: int = 8
+) -> List[Dict[str, Any]]:
+    """Run many (html, test_steps) jobs concurrently, adding each run's duration_ms."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(html, test_steps):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await run(html, test_steps)
+            result['duration_ms'] = int((time.perf_counter() - started) * 1000)
+            return result
+
+    return await asyncio.gather(*(run_one(html, test_steps) for html, test_steps in jobs))
 
 async def screenshot(html: str, out_path: str):
     try:
-        async with async_playwright() as p:
-            # Launch browser with proper Docker configuration
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-dev-shm-usage',
-                    '--disable-accelerated-2d-canvas',
-                    '--no-first-run',
-                    '--no-zygote',
-                    '--disable-gpu'
-                ]
-            )
-            page = await browser.new_page()
+        # Set viewport for consistent thumbnail size
+        async with browser_pool.page(viewport={"width": 600, "height": 800}) as page:
             await page.set_content(html)
-            # Set viewport for consistent thumbnail size
-            await page.set_viewport_size({"width": 600, "height": 800})
             await page.screenshot(path=out_path, full_page=True)
-            await browser.close()
     except Exception as e:
         print(f"Screenshot failed: {str(e)}", file=sys.stderr)
 
+async def render_many(
+    jobs: List[Tuple[str, List[Tuple[str, str]]]], concurrency: int = 4
+) -> List[Dict[str, bool]]:
+    """Capture every (html, [(profile, out_path), ...]) job in all of its render profiles.
+
+    Each HTML document is loaded once and re-captured per profile on the
+    same page; pages are reused across jobs, one per worker. Returns a
+    profile -> success mapping for every job, in the same order as ``jobs``.
+    """
+    results: List[Dict[str, bool]] = [
+        {name: False for name, _ in captures} for _, captures in jobs
+    ]
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, job in enumerate(jobs):
+        queue.put_nowait((index, job))
+
+    async def worker():
+        async with browser_pool.page(viewport=RENDER_PROFILES['desktop']['viewport']) as page:
+            while True:
+                try:
+                    index, (html, captures) = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    results[index] = await capture_profiles(page, html, captures)
+                except Exception as e:
+                    print(f"Render failed for job {index}: {str(e)}", file=sys.stderr)
+
+    workers = min(concurrency, len(jobs))
+    if workers:
+        outcomes = await asyncio.gather(*(worker() for _ in range(workers)), return_exceptions=True)
+        for outcome in outcomes:
+            if isinstance(outcome, Exception):
+                print(f"Render worker failed: {str(outcome)}", file=sys.stderr)
+    return results
+
+async def _run_once(coro):
+    """Await a single command and shut the browser pool down afterwards."""
+    try:
+        return await coro
+    finally:
+        await browser_pool.stop()
+
 if __name__ == '__main__':
     # Usage:
     #   python test_runner.py <html_path> [screenshot <screenshot_path>] [test_steps <test_steps_json>]
@@ -68,13 +136,13 @@ if __name__ == '__main__':
     
     if len(sys.argv) > 2 and sys.argv[2] == 'screenshot':
         screenshot_path = sys.argv[3]
-        asyncio.run(screenshot(html, screenshot_path))
+        asyncio.run(_run_once(screenshot(html, screenshot_path)))
         print(json.dumps({'screenshot': screenshot_path}))
     elif len(sys.argv) > 2 and sys.argv[2] == 'test_steps':
         test_steps_json = sys.argv[3]
         test_steps = json.loads(test_steps_json)
-        result = asyncio.run(run(html, test_steps))
+        result = asyncio.run(_run_once(run(html, test_steps)))
         print(json.dumps(result))
     else:
-        result = asyncio.run(run(html))
+        result = asyncio.run(_run_once(run(html)))
         print(json.dumps(result))
@@ -0,0 +1,33 @@
+from typing import Optional
+from urllib.parse import quote
+
+# Origin under which in-memory documents are served; it never reaches the network
+VIRTUAL_ORIGIN = 'http://email.local'
+
+
+def document_url(filename: Optional[str] = None) -> str:
+    """URL an in-memory document is served at, e.g. http://email.local/welcome.html."""
+    name = (filename or 'index.html').replace('\\', '/').rsplit('/', 1)[-1] or 'index.html'
+    return f"{VIRTUAL_ORIGIN}/{quote(name)}"
+
+
+async def load_html(page, html: str, filename: Optional[str] = None, wait_until: str = 'load') -> str:
+    """Navigate ``page`` to ``html`` served from memory on the virtual origin.
+
+    Unlike ``set_content`` the page gets a real http URL, so relative links
+    resolve against it and URL assertions see a stable address. Other
+    requests to the virtual origin get a 404; requests to any other host go
+    through the regular context routes (asset cache) as before.
+    """
+    url = document_url(filename)
+    body = html.encode('utf-8')
+
+    async def serve(route):
+        if route.request.url.split('#', 1)[0] == url:
+            await route.fulfill(status=200, body=body, headers={'content-type': 'text/html; charset=utf-8'})
+        else:
+            await route.fulfill(status=404, body=b'')
+
+    await page.route(f"{VIRTUAL_ORIGIN}/**", serve)
+    await page.goto(url, wait_until=wait_until)
+    return url
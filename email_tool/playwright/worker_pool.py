@@ -0,0 +1,159 @@
+import asyncio
+import atexit
+import itertools
+import math
+import multiprocessing
+import os
+import signal
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, List, Optional, Sequence
+
+# Event loop owned by a worker process; its browser pool lives on this loop
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+# Queue the worker announces every job on, so a crash can be traced to its job
+_started_queue = None
+
+
+def _init_worker(started_queue):
+    global _worker_loop, _started_queue
+    _started_queue = started_queue
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    atexit.register(_shutdown_worker)
+
+
+def _shutdown_worker():
+    try:
+        from email_tool.playwright.browser_pool import browser_pool
+        _worker_loop.run_until_complete(browser_pool.stop())
+    except Exception as e:
+        print(f"Failed to stop worker browser pool: {e}", file=sys.stderr)
+
+
+def _run_in_worker(func: Callable[..., Awaitable[Any]], args: tuple, job_id: int) -> Any:
+    """Run ``await func(*args)`` on the worker's persistent event loop.
+
+    The loop outlives individual jobs, so the worker's browser pool is
+    launched once and reused by every job sent to this process.
+    """
+    _started_queue.put((job_id, os.getpid()))
+    return _worker_loop.run_until_complete(func(*args))
+
+
+class BrowserWorkerPool:
+    """Run browser jobs in a pool of separate processes.
+
+    Every worker process owns its own event loop and browser pool, so heavy
+    screenshot and test runs stay off the API's event loop and spread over
+    all cores. Jobs are module-level coroutine functions whose arguments and
+    results are picklable. If a worker dies the pool is rebuilt and the jobs
+    it took down are retried once, except the job that was running in the
+    dead worker, which would only crash the new pool too. With
+    ``workers=0`` jobs simply run in-process.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_retries: int = 1):
+        self.workers = workers if workers is not None else int(os.getenv('BROWSER_WORKERS', '0'))
+        self.max_retries = max_retries
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started_queue = None
+        self._lock = asyncio.Lock()
+        self._job_ids = itertools.count()
+        # Worker pid of every job that has started, and the jobs whose worker crashed
+        self._job_pids: dict[int, int] = {}
+        self._crashed_jobs: set[int] = set()
+
+    @property
+    def in_process(self) -> bool:
+        return self.workers <= 0
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context('spawn')
+        # A fresh queue per pool: a worker killed mid-put may leave the old one locked
+        self._started_queue = context.SimpleQueue()
+        # Spawned workers start clean instead of inheriting the API's event loop
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._started_queue,),
+        )
+
+    def _drain_started(self, queue):
+        try:
+            while not queue.empty():
+                job_id, pid = queue.get()
+                self._job_pids[job_id] = pid
+        except Exception as e:
+            print(f"Failed to read started browser jobs: {e}", file=sys.stderr)
+
+    async def start(self):
+        if self.in_process or self._executor is not None:
+            return
+        self._executor = self._create_executor()
+
+    async def stop(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+
+    async def _restart(self, broken: ProcessPoolExecutor):
+        async with self._lock:
+            # Another job may already have replaced the broken executor
+            if self._executor is not broken:
+                return
+            print("Browser worker crashed; restarting the worker pool", file=sys.stderr)
+            processes = list((broken._processes or {}).values())
+            queue = self._started_queue
+            self._executor = self._create_executor()
+            # The broken pool terminates its other workers; wait for that so
+            # the crashed one is the only worker not stopped by SIGTERM
+            await asyncio.to_thread(broken.shutdown, True, cancel_futures=True)
+            self._drain_started(queue)
+            crashed = {process.pid for process in processes if process.exitcode not in (None, -signal.SIGTERM)}
+            self._crashed_jobs.update(job_id for job_id, pid in self._job_pids.items() if pid in crashed)
+
+    async def submit(self, func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Run ``await func(*args)`` in a worker process and return its result."""
+        if self.in_process:
+            return await func(*args)
+        if self._executor is None:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            executor, queue = self._executor, self._started_queue
+            job_id = next(self._job_ids)
+            try:
+                return await loop.run_in_executor(executor, _run_in_worker, func, args, job_id)
+            except BrokenProcessPool:
+                await self._restart(executor)
+                crashed = job_id in self._crashed_jobs
+                attempt += 1
+                if crashed or attempt > self.max_retries:
+                    raise
+            finally:
+                self._drain_started(queue)
+                self._job_pids.pop(job_id, None)
+                self._crashed_jobs.discard(job_id)
+
+    async def map_chunks(self, func: Callable[..., Awaitable[List[Any]]], items: Sequence[Any], *args: Any) -> List[Any]:
+        """Split ``items`` over the workers and run ``await func(chunk, *args)`` for each chunk.
+
+        ``func`` must return one result per item; results come back in the
+        order of ``items``. Batching keeps each worker busy with its own
+        concurrent jobs instead of paying an IPC round-trip per item.
+        """
+        if not items:
+            return []
+        chunk_count = max(1, min(self.workers, len(items)))
+        size = math.ceil(len(items) / chunk_count)
+        chunks = [list(items[start:start + size]) for start in range(0, len(items), size)]
+        results = await asyncio.gather(*(self.submit(func, chunk, *args) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+
+# Shared worker pool for browser jobs
+worker_pool = BrowserWorkerPool()
@@ -0,0 +1,54 @@
+import sys
+import os
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.playwright.asset_cache import AssetCache, is_tracking_url
+
+def test_round_trip(tmp_path):
+    cache = AssetCache(tmp_path, max_bytes=1024)
+    cache.put("https://cdn.example.com/logo.png", b"png-bytes", "image/png")
+    assert cache.get("https://cdn.example.com/logo.png") == (b"png-bytes", "image/png")
+    assert cache.get("https://cdn.example.com/missing.png") is None
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = AssetCache(tmp_path, max_bytes=10)
+    cache.put("https://a/1", b"aaaa", "image/png")
+    cache.put("https://a/2", b"bbbb", "image/png")
+    # Touch the first entry so the second becomes least recently used
+    assert cache.get("https://a/1") is not None
+    cache.put("https://a/3", b"cccc", "image/png")
+    assert cache.get("https://a/2") is None
+    assert cache.get("https://a/1") is not None
+    assert cache.total_bytes == 8
+
+def test_index_survives_restart(tmp_path):
+    AssetCache(tmp_path, max_bytes=1024).put("https://a/font.woff2", b"font", "font/woff2")
+    reopened = AssetCache(tmp_path, max_bytes=1024)
+    assert reopened.get("https://a/font.woff2") == (b"font", "font/woff2")
+
+def test_tracking_urls():
+    assert is_tracking_url("https://www.google-analytics.com/collect?v=1")
+    assert is_tracking_url("https://click.example.com/track/open?id=1")
+    assert not is_tracking_url("https://cdn.example.com/hero.png")
+
+def test_entries_expire(tmp_path):
+    cache = AssetCache(tmp_path, max_bytes=1024, default_ttl=60)
+    cache.put("https://a/hero.png", b"old", "image/png", "public, max-age=0")
+    assert cache.get("https://a/hero.png") is None
+    cache.put("https://a/hero.png", b"new", "image/png", "no-store")
+    assert cache.get("https://a/hero.png") is None
+    cache.put("https://a/hero.png", b"new", "image/png")
+    assert cache.ttl("max-age=300") == 300
+    assert cache.get("https://a/hero.png") == (b"new", "image/png")
+
+def test_size_cap_is_shared_between_processes(tmp_path):
+    # Two instances over one directory stand in for two worker processes
+    first = AssetCache(tmp_path, max_bytes=10)
+    second = AssetCache(tmp_path, max_bytes=10)
+    first.put("https://a/1", b"aaaa", "image/png")
+    second.put("https://a/2", b"bbbb", "image/png")
+    first.put("https://a/3", b"cccc", "image/png")
+    assert first.total_bytes == second.total_bytes == 8
+    assert second.get("https://a/1") is None
@@ -0,0 +1,111 @@
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.playwright.link_checker import LinkChecker, extract_links
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def _respond(self, with_body):
+        StubHandler.hits.append((self.command, self.path))
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/ok')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path == '/no-head' and self.command == 'HEAD':
+            status = 405
+        else:
+            status = {'/ok': 200, '/no-head': 200, '/busy': 503}.get(self.path, 404)
+        body = b'hello'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StubHandler.hits = []
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_extract_links_dedupes_absolute_links():
+    html = (
+        '<a href="https://a.com/x#top">1</a><a href="https://a.com/x">2</a>'
+        '<a href="mailto:me@a.com">3</a><a href="/relative">4</a><img src="https://a.com/i.png">'
+    )
+    assert extract_links(html) == ['https://a.com/x']
+
+
+@pytest.mark.asyncio
+async def test_checks_links_against_stub_server(stub_server):
+    checker = LinkChecker(concurrency=4, per_host=2, host_interval=0, timeout=5, cache_ttl=60)
+    urls = [f"{stub_server}/ok", f"{stub_server}/missing", f"{stub_server}/no-head", f"{stub_server}/redirect"]
+    results = await checker.check_many(urls + [f"{stub_server}/ok"])
+
+    assert results[f"{stub_server}/ok"]['ok']
+    assert results[f"{stub_server}/missing"]['status_code'] == 404
+    assert not results[f"{stub_server}/missing"]['ok']
+    # HEAD is refused, so the checker falls back to GET
+    assert results[f"{stub_server}/no-head"]['status_code'] == 200
+    assert results[f"{stub_server}/redirect"]['final_url'] == f"{stub_server}/ok"
+
+    # A second run is served from the TTL cache without touching the server
+    hits = len(StubHandler.hits)
+    again = await checker.check_many(urls)
+    assert all(result['cached'] for result in again.values())
+    assert len(StubHandler.hits) == hits
+
+
+@pytest.mark.asyncio
+async def test_unreachable_host_is_reported():
+    checker = LinkChecker(timeout=1, cache_ttl=0)
+    results = await checker.check_many(['http://127.0.0.1:9/closed'])
+    result = results['http://127.0.0.1:9/closed']
+    assert not result['ok']
+    assert result['status_code'] is None
+    assert result['error']
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_not_cached_for_long(stub_server):
+    checker = LinkChecker(host_interval=0, timeout=5, cache_ttl=60, failure_ttl=0)
+    await checker.check_many([f"{stub_server}/busy", f"{stub_server}/missing"])
+    results = await checker.check_many([f"{stub_server}/busy", f"{stub_server}/missing"])
+
+    # A 503 may clear up, so it is checked again; a 404 is a definite answer
+    assert results[f"{stub_server}/busy"]['status_code'] == 503
+    assert not results[f"{stub_server}/busy"]['cached']
+    assert results[f"{stub_server}/missing"]['cached']
+
+
+def test_cache_is_bounded():
+    checker = LinkChecker(cache_ttl=60, cache_size=2)
+    for index in range(3):
+        checker._store(f"https://a.com/{index}", {'url': f"https://a.com/{index}", 'status_code': 200, 'ok': True})
+    assert checker.cached('https://a.com/0') is None
+    assert checker.cached('https://a.com/2')['cached']
@@ -0,0 +1,33 @@
+import sys
+import os
+from types import SimpleNamespace
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.backend.services.locale_resolver import LocaleResolver, fallback_chain
+
+def copy(locale, key, value):
+    return SimpleNamespace(locale=locale, key=key, value=value)
+
+COPIES = [
+    copy('en', 'title', 'Hello'), copy('en', 'cta', 'Buy'), copy('en', 'footer', 'Bye'),
+    copy('fr', 'title', 'Bonjour'), copy('fr', 'cta', 'Acheter'),
+    copy('fr-CA', 'cta', 'Magasiner'),
+]
+
+def test_default_chain():
+    assert fallback_chain('fr-CA') == ['fr-CA', 'fr', 'en']
+    assert fallback_chain('en-GB') == ['en-GB', 'en']
+    assert fallback_chain('en') == ['en']
+
+def test_resolves_through_fallbacks():
+    resolver = LocaleResolver(COPIES)
+    assert resolver.locales == ['en', 'fr', 'fr-CA']
+    assert resolver.resolve('fr-CA') == {'title': 'Bonjour', 'cta': 'Magasiner', 'footer': 'Bye'}
+    assert resolver.resolve('fr') == {'title': 'Bonjour', 'cta': 'Acheter', 'footer': 'Bye'}
+
+def test_project_overrides_replace_the_chain():
+    resolver = LocaleResolver(COPIES, {'fr-CA': ['en']})
+    assert resolver.chain('fr-CA') == ['fr-CA', 'en']
+    assert resolver.resolve('fr-CA') == {'title': 'Hello', 'cta': 'Magasiner', 'footer': 'Bye'}
@@ -0,0 +1,32 @@
+import sys
+import os
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.playwright.phase_timer import PhaseTimer, percentile, summarize_timings
+
+def test_timer_records_phases_and_steps():
+    timer = PhaseTimer()
+    with timer.phase('goto'):
+        pass
+    with timer.phase('goto'):
+        pass
+    with timer.step(1, 'click'):
+        pass
+    timer.add_step(2, 'expectText', 4.0, batched=2)
+    timings = timer.to_dict()
+    assert list(timings['phases']) == ['goto']
+    assert [s['action'] for s in timings['steps']] == ['click', 'expectText']
+    assert timings['steps'][1]['batched'] == 2
+
+def test_summary_percentiles_per_action():
+    runs = [
+        {'total_ms': float(i), 'phases': {'goto': float(i)}, 'steps': [{'step': 1, 'action': 'click', 'ms': float(i)}]}
+        for i in range(1, 21)
+    ]
+    summary = summarize_timings(runs + [None])
+    assert summary['runs'] == 20
+    assert summary['actions']['click'] == {'count': 20, 'p50_ms': 10.0, 'p95_ms': 19.0}
+    assert summary['phases']['goto']['p95_ms'] == 19.0
+    assert percentile([], 50) is None
@@ -0,0 +1,39 @@
+import sys
+import os
+import pytest
+from jinja2 import Template
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.backend.services.placeholder_template import compile_segments, render_segments
+
+COPY = {'title': 'Hello', 'cta': 'Buy <now>', 'footer': 'Bye'}
+
+@pytest.mark.parametrize('source', [
+    '<h1>{{ title }}</h1><a>{{cta}}</a>',
+    '{{title}}',
+    'no placeholders at all',
+    '<p>{{ title }}</p>\r\n<p>{{ missing }}</p>\n',
+    'line one\rline two\n\n',
+    '{ not a placeholder } {{footer}}',
+])
+def test_segments_match_jinja(source):
+    segments = compile_segments(source)
+    assert segments is not None
+    assert render_segments(segments, COPY) == Template(source).render(**COPY)
+
+@pytest.mark.parametrize('source', [
+    '{% if title %}{{ title }}{% endif %}',
+    '{{ title | upper }}',
+    '{# comment #}{{ title }}',
+    '{{ none }}',
+    '{{ 123 }}',
+])
+def test_jinja_syntax_falls_back(source):
+    assert compile_segments(source) is None
+
+def test_hyphenated_keys():
+    segments = compile_segments('<p>Hi {{ first-name }}</p>')
+    assert segments == ['<p>Hi ', 'first-name', '</p>']
+    assert render_segments(segments, {'first-name': 'Ada'}) == '<p>Hi Ada</p>'
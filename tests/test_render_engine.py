@@ -0,0 +1,45 @@
+import sys
+import os
+import pytest
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.backend.services.placeholder_template import compile_segments
+from email_tool.backend.services.render_engine import RenderEngine, RenderTask
+
+TASKS = [
+    RenderTask('<p>{{ title }}</p>', [(f'l{i}', {'title': f'Hello {i}'}) for i in range(5)]),
+    RenderTask('{% for %}', [('en', {})]),
+    RenderTask('<b>{{ cta }}</b>', []),
+    RenderTask('<i>{{ cta | upper }}</i>', [('en', {'cta': 'buy'}), ('fr', {'cta': 'acheter'})]),
+    RenderTask('<p>{{first-name}}</p>', [('en', {'first-name': 'Ada'})], compile_segments('<p>{{first-name}}</p>')),
+]
+
+async def collect(engine):
+    collected = {}
+    async for index, results in engine.render(TASKS):
+        assert len(results) <= engine.chunk_size
+        collected.setdefault(index, []).extend((html, error is not None) for html, error, _ in results)
+    return collected
+
+def test_auto_mode_threshold():
+    engine = RenderEngine(workers=2, mode='auto', threshold=100)
+    assert engine.choose_mode([RenderTask('x' * 10, [('en', {})] * 5)]) == 'serial'
+    assert engine.choose_mode([RenderTask('x' * 10, [('en', {})] * 10)]) == 'process'
+    assert RenderEngine(workers=0, mode='process').choose_mode(TASKS) == 'serial'
+
+@pytest.mark.asyncio
+async def test_process_mode_matches_serial():
+    serial = await collect(RenderEngine(workers=0, chunk_size=2))
+    engine = RenderEngine(workers=2, mode='process', chunk_size=2)
+    try:
+        parallel = await collect(engine)
+    finally:
+        await engine.stop()
+    assert parallel == serial
+    assert list(serial) == [0, 1, 3, 4]
+    assert serial[0][4] == ('<p>Hello 4</p>', False)
+    assert serial[1] == [(None, True)]
+    assert serial[3] == [('<i>BUY</i>', False), ('<i>ACHETER</i>', False)]
+    assert serial[4] == [('<p>Ada</p>', False)]
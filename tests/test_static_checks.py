@@ -0,0 +1,58 @@
+import sys
+import os
+import asyncio
+import pytest
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.playwright import static_checks
+from email_tool.playwright.static_checks import validate_html, validate_many
+
+def test_clean_email_passes():
+    html = '<a href="https://example.com">Shop</a><img src="a.png" alt="Logo">'
+    result = validate_html(html)
+    assert result['passed']
+    assert result['issues'] == []
+
+def test_reports_default_checks():
+    html = "<p>{{first-name}}</p><a>no link</a>"
+    issues = validate_html(html)['issues']
+    assert 'Unreplaced placeholders' in issues
+    assert 'missing href' in issues
+
+def test_reports_richer_checks():
+    html = (
+        '<a href="">empty</a>'
+        '<a href="javascript:void(0)">js</a>'
+        '<img src="hero.png">'
+        '<div data-testid="cta"></div><span data-testid="cta"></span>'
+    )
+    issues = validate_html(html)['issues']
+    assert 'empty href' in issues
+    assert any(issue.startswith('javascript: href') for issue in issues)
+    assert 'missing alt (hero.png)' in issues
+    assert 'duplicate data-testid "cta" (2 elements)' in issues
+
+@pytest.mark.asyncio
+async def test_validate_many_uses_worker_processes(monkeypatch):
+    monkeypatch.setattr(static_checks, 'PROCESS_THRESHOLD', 2)
+    htmls = ['<a href="x">ok</a>', '<a>bad</a>', '<img src="x">']
+    try:
+        results = await validate_many(htmls, max_workers=2)
+    finally:
+        await static_checks.stop()
+    assert [r['passed'] for r in results] == [True, False, False]
+
+@pytest.mark.asyncio
+async def test_validate_many_reuses_its_workers(monkeypatch):
+    monkeypatch.setattr(static_checks, 'PROCESS_THRESHOLD', 2)
+    try:
+        await validate_many(['<a href="x">ok</a>', '<a>bad</a>'], max_workers=2)
+        executor = static_checks._executor
+        results = await validate_many(['<img src="x">', '<img src="x" alt="">'], max_workers=2)
+        assert static_checks._executor is executor
+        assert [r['passed'] for r in results] == [False, True]
+    finally:
+        await static_checks.stop()
+    assert static_checks._executor is None
@@ -0,0 +1,82 @@
+import sys
+import os
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.playwright.static_dom import scenario_needs_browser
+from email_tool.backend.services import test_builder_service
+
+HTML = """
+<html><head><title>  Spring
+  Sale </title></head>
+<body>
+  <h1 data-testid="headline">Hello
+     world</h1>
+  <a data-testid="cta" class="btn primary" href="https://example.com/shop">Shop</a>
+</body></html>
+"""
+
+def step(order, action, selector=None, value=None, attr=None):
+    return SimpleNamespace(step_order=order, action=action, selector=selector, value=value, attr=attr)
+
+def test_classifies_scenarios():
+    assert not scenario_needs_browser([step(1, 'expectText', 'headline', 'x')], HTML)
+    assert scenario_needs_browser([step(1, 'click', 'cta')], HTML)
+    assert scenario_needs_browser([step(1, 'expectText', 'headline', 'x')], HTML + '<script></script>')
+
+def test_static_scenario_passes_without_browser():
+    scenario = SimpleNamespace(html_content=HTML, html_filename='spring.html')
+    steps = [
+        step(1, 'waitForPageLoad'),
+        step(2, 'expectText', 'headline', 'Hello world'),
+        step(3, 'expectAttr', 'cta', 'btn primary', 'class'),
+        step(4, 'expectPageTitle', value='Spring Sale'),
+        step(5, 'expectUrlContains', value='spring.html'),
+    ]
+    outcome = test_builder_service.TestBuilderService()._execute_scenario_static(scenario, steps, datetime.now())
+    assert outcome['status'] == 'passed', outcome['logs']
+    assert len(outcome['timings']['steps']) == 5
+
+def test_static_scenario_reports_missing_element():
+    scenario = SimpleNamespace(html_content=HTML, html_filename='spring.html')
+    outcome = test_builder_service.TestBuilderService()._execute_scenario_static(
+        scenario, [step(1, 'expectText', 'missing', 'x')], datetime.now()
+    )
+    assert outcome['status'] == 'failed'
+    assert outcome['error_message'] == "Element 'missing' not found"
+
+# Markup with implied end tags, and the textContent a browser reports for it
+IMPLIED_END_TAGS = [
+    ('<table><tr><td data-testid="price">$5<td>Next</table>', 'price', '$5'),
+    ('<p data-testid="a">Hello<p>World', 'a', 'Hello'),
+    ('<ul><li data-testid="item">One<li>Two</ul>', 'item', 'One'),
+]
+
+def observe_static(html, selector):
+    from email_tool.playwright.static_dom import observe, static_dom_cache
+    return observe(static_dom_cache.get(html), step(1, 'expectText', selector), 'http://email.local/x.html')
+
+@pytest.mark.parametrize('html,selector,expected', IMPLIED_END_TAGS)
+def test_static_dom_closes_tags_like_a_browser(html, selector, expected):
+    assert observe_static(html, selector) == {'found': True, 'value': expected}
+
+@pytest.mark.asyncio
+async def test_static_and_browser_observations_agree():
+    from email_tool.playwright.scenario_assertions import OBSERVE_SCRIPT, testid_selector
+    playwright_api = pytest.importorskip('playwright.async_api')
+    async with playwright_api.async_playwright() as p:
+        try:
+            browser = await p.chromium.launch()
+        except Exception as e:
+            pytest.skip(f"Chromium is not available: {e}")
+        page = await browser.new_page()
+        for html, selector, _ in IMPLIED_END_TAGS:
+            await page.set_content(html)
+            probe = {'kind': 'text', 'selector': testid_selector(selector), 'attr': None}
+            [observed] = await page.evaluate(OBSERVE_SCRIPT, [probe])
+            assert observed == observe_static(html, selector)
+        await browser.close()
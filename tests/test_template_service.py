@@ -53,3 +53,5 @@ async def test_upload_template_hyphenated_placeholders():
     assert set(keys) == {"first-name", "last_name"}
     placeholder_keys = [p.key for p in service.placeholder_repository.created]
     assert set(placeholder_keys) == {"first-name", "last_name"}
+    # Plain placeholders are compiled for the fast render path at upload
+    assert template.segments == ["<p>", "first-name", "</p><div>", "last_name", "</div>"]
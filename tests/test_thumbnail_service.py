@@ -0,0 +1,33 @@
+import sys
+import os
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from PIL import Image
+from email_tool.backend.services.thumbnail_service import ThumbnailService
+
+def test_variant_urls_follow_naming_scheme_without_files(tmp_path):
+    service = ThumbnailService(tmp_path)
+    ext = service.extension
+    urls = service.variant_urls('/static/screenshots/abc.png')
+    assert set(urls) == {'w160', 'w320', 'w640', 'fold'}
+    assert service.list_url('/static/screenshots/abc.png') == f'/static/screenshots/abc_fold.{ext}'
+
+    # Only recorded derivatives are linked; without a fold crop lists use the original
+    assert service.variant_urls('/static/screenshots/abc.png', ['w160']) == {'w160': f'/static/screenshots/abc_w160.{ext}'}
+    assert service.list_url('/static/screenshots/abc.png', []) == '/static/screenshots/abc.png'
+
+
+def test_existing_variants_fall_back_to_png_for_old_previews(tmp_path):
+    service = ThumbnailService(tmp_path)
+    Image.new('RGB', (800, 1200), 'white').save(tmp_path / 'template_1_old.png')
+    Image.new('RGB', (800, 1200), 'white').save(tmp_path / 'template_1_new.png')
+    service.create_derivatives(tmp_path / 'template_1_new.png')
+
+    listing = [file.name for file in tmp_path.glob('template_1_*')]
+    assert service.existing_variants(tmp_path / 'template_1_old.png', listing) == []
+    assert service.existing_variants(tmp_path / 'template_1_old.png') == []
+    assert service.existing_variants(tmp_path / 'template_1_new.png', listing) == ['fold', 'w160', 'w320', 'w640']
+    old_url = '/static/screenshots/template_1_old.png'
+    assert service.list_url(old_url, service.existing_variants(tmp_path / 'template_1_old.png')) == old_url
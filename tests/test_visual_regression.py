@@ -0,0 +1,40 @@
+import sys
+import os
+from PIL import Image, ImageDraw
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.backend.services.visual_regression_service import VisualRegressionService
+
+def save_render(path, price):
+    image = Image.new('RGB', (600, 800), 'white')
+    ImageDraw.Draw(image).text((40, 400), f"Now only {price}", fill='black')
+    image.save(path)
+
+def test_small_text_change_is_diffed_despite_matching_hash(tmp_path):
+    save_render(tmp_path / 'baseline.png', '$19.99')
+    save_render(tmp_path / 'current.png', '$18.99')
+    service = VisualRegressionService(screenshots_dir=tmp_path)
+    baseline_hash = service.phash('/static/screenshots/baseline.png')
+    assert baseline_hash == service.phash('/static/screenshots/current.png')
+
+    result = service.compare('/static/screenshots/baseline.png', baseline_hash, '/static/screenshots/current.png')
+    assert result['pixel_diff'] and result['score'] > 0
+    assert result['diff_url'].startswith('/static/screenshots/diff_')
+
+def test_phash_cache_is_bounded(tmp_path):
+    service = VisualRegressionService(screenshots_dir=tmp_path)
+    service.phash_cache_size = 2
+    for price in range(3):
+        save_render(tmp_path / f'{price}.png', price)
+        service.phash(f'/static/screenshots/{price}.png')
+    assert list(service._phash_cache) == ['1.png', '2.png']
+
+def test_colour_only_change_is_detected(tmp_path):
+    Image.new('RGB', (60, 80), '#0000FF').save(tmp_path / 'blue.png')
+    Image.new('RGB', (60, 80), '#000080').save(tmp_path / 'navy.png')
+    service = VisualRegressionService(screenshots_dir=tmp_path)
+    baseline_hash = service.phash('/static/screenshots/blue.png')
+    result = service.compare('/static/screenshots/blue.png', baseline_hash, '/static/screenshots/navy.png')
+    assert result['score'] == 1.0
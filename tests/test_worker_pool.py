@@ -0,0 +1,33 @@
+import sys
+import os
+import asyncio
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+
+# Ensure package imports work
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from email_tool.playwright.worker_pool import BrowserWorkerPool
+
+async def crash(delay):
+    await asyncio.sleep(delay)
+    os._exit(1)
+
+async def echo(value, delay):
+    await asyncio.sleep(delay)
+    return value
+
+@pytest.mark.asyncio
+async def test_crashing_job_is_not_retried():
+    pool = BrowserWorkerPool(workers=2)
+    try:
+        crashed, survivor = await asyncio.gather(
+            pool.submit(crash, 0.5), pool.submit(echo, 'ok', 2), return_exceptions=True
+        )
+        # The job that took its worker down fails; the one it took along is retried
+        assert isinstance(crashed, BrokenProcessPool)
+        assert survivor == 'ok'
+        assert await pool.submit(echo, 'again', 0) == 'again'
+        assert not pool._job_pids and not pool._crashed_jobs
+    finally:
+        await pool.stop()